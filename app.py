@@ -6,37 +6,58 @@ This Flask application provides a web interface for users to generate
 business mailing lists without needing to install Python or run commands.
 """
 
-from flask import Flask, render_template, request, send_file, jsonify, flash
+from flask import Flask, Response, render_template, request, send_file, jsonify, flash
 import os
 import tempfile
 import json
-import uuid
+import time
+from typing import Optional
 from datetime import datetime
 from main import MailingListGenerator
+from category_registry import get_category_registry
 from yelp_api_client import YelpAPIClient
 from excel_generator import ExcelGenerator
+from summary_accumulator import SummaryAccumulator
+from exporters import EXPORTERS
+from job_queue import JobQueue, Job, FINISHED
+from progress import ProgressReporter
+from artifact_store import get_artifact_store
+from shared_instance import SharedInstance
+from config import SSE_KEEPALIVE_SECONDS, ARTIFACT_TTL_SECONDS
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-change-this')
 
-# In-memory file storage for temporary files
-file_storage = {}
+# Generated files waiting to be downloaded
+artifact_store = get_artifact_store()
 
-# Load Yelp categories for the dropdown
-def load_categories():
+# One generator per process, shared by every request and job thread
+_generator = SharedInstance(MailingListGenerator)
+
+def get_generator() -> MailingListGenerator:
+    """
+    Get the process-wide MailingListGenerator, building it on first use.
+    
+    Sharing it keeps the Yelp client's connection pool, response cache and
+    rate limiter warm from one job to the next.
+    
+    Raises:
+        ValueError: If no Yelp API key is configured
+    """
+    return _generator.get()
+
+def init_worker() -> None:
+    """Build the generator as a job worker starts, so the first job doesn't wait for it."""
     try:
-        with open('yelp_categories.json', 'r') as f:
-            categories = json.load(f)
-        return categories
-    except Exception as e:
-        print(f"Error loading categories: {e}")
-        return []
+        get_generator()
+    except ValueError as e:
+        # Jobs will fail with this message until the key is set
+        print(f"⚠️  {e}")
 
 @app.route('/')
 def index():
     """Main page with the form."""
-    categories = load_categories()
-    return render_template('index.html', categories=categories)
+    return render_template('index.html')
 
 @app.route('/generate', methods=['POST'])
 def generate_mailing_list():
@@ -48,6 +69,9 @@ def generate_mailing_list():
         radius_miles = request.form.get('radius', '25').strip()
         max_results = request.form.get('max_results', '100').strip()
         filename = request.form.get('filename', '').strip()
+        output_format = request.form.get('output_format', 'xlsx').strip().lower()
+        include_subcategories = request.form.get('include_subcategories', '').lower() in ('true', 'on', '1')
+        enrich = request.form.get('enrich', '').lower() in ('true', 'on', '1')
         
         # Validate required fields
         if not location:
@@ -70,118 +94,225 @@ def generate_mailing_list():
         except ValueError:
             return jsonify({'error': 'Invalid max results value'}), 400
         
+        # Validate output format
+        if output_format not in EXPORTERS:
+            return jsonify({'error': f"Output format must be one of: {', '.join(EXPORTERS)}"}), 400
+        
         # Generate filename if not provided
+        extension = EXPORTERS[output_format].extension
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"business_mailing_list_{timestamp}.xlsx"
-        elif not filename.endswith('.xlsx'):
-            filename += '.xlsx'
-        
-        # Initialize the mailing list generator
-        generator = MailingListGenerator()
-        
-        # Search for businesses
-        businesses = generator.yelp_client.search_businesses(
-            location=location,
-            business_type=business_type if business_type else None,
-            radius=radius_meters,
-            max_results=max_results
-        )
-        
-        if not businesses:
-            return jsonify({'error': 'No businesses found matching your criteria'}), 404
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as tmp_file:
-            temp_path = tmp_file.name
+            filename = f"business_mailing_list_{timestamp}{extension}"
+        elif not filename.endswith(extension):
+            filename += extension
         
-        # Export to Excel
-        generator.excel_generator.export_to_excel(
-            businesses=businesses,
-            filename=temp_path
-        )
-        
-        # Create summary sheet
-        generator.excel_generator.create_summary_sheet(businesses, temp_path)
-        
-        # Generate unique file ID and store file info
-        file_id = str(uuid.uuid4())
-        file_storage[file_id] = {
-            'path': temp_path,
+        # Queue the search and export for a background worker
+        job = job_queue.submit({
+            'location': location,
+            'business_type': business_type if business_type else None,
+            'include_subcategories': include_subcategories,
+            'enrich': enrich,
+            'radius': radius_meters,
+            'max_results': max_results,
             'filename': filename,
-            'created_at': datetime.now()
-        }
-        
-        # Clean up old files (older than 1 hour)
-        cleanup_old_files()
+            'output_format': output_format,
+            # Worker processes can only reach a store shared on disk
+            'store_artifact': job_queue.mode == 'thread' or artifact_store.shared
+        })
         
-        # Return success response with file info
         return jsonify({
             'success': True,
-            'message': f'Found {len(businesses)} businesses',
-            'filename': filename,
-            'file_id': file_id,
-            'business_count': len(businesses)
-        })
+            'message': 'Mailing list queued',
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': f'/jobs/{job.id}',
+            'download_url': f'/jobs/{job.id}/download'
+        }), 202
         
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
-def cleanup_old_files():
-    """Clean up files older than 1 hour."""
-    current_time = datetime.now()
-    files_to_remove = []
+def run_generate_job(params: dict, progress: Optional[ProgressReporter] = None) -> dict:
+    """
+    Search for businesses and export them to a temporary file.
     
-    for file_id, file_info in file_storage.items():
-        time_diff = current_time - file_info['created_at']
-        if time_diff.total_seconds() > 3600:  # 1 hour
-            files_to_remove.append(file_id)
+    Runs on a background worker, so it must stay a picklable module-level
+    function.
     
-    for file_id in files_to_remove:
-        try:
-            if os.path.exists(file_storage[file_id]['path']):
-                os.unlink(file_storage[file_id]['path'])
-            del file_storage[file_id]
-        except:
-            pass
+    Args:
+        params: Search parameters queued by /generate
+        progress: Reporter for search and export events (optional)
+        
+    Returns:
+        Dictionary with the file path, filename, mimetype and business count
+    """
+    generator = get_generator()
+    exporter = generator.exporter_for(params)
+    if progress is not None:
+        progress('stage', stage='searching')
+    
+    # Stream search results straight into the file as pages arrive
+    businesses = generator.iter_search(params, progress=progress)
+    
+    result = {
+        'filename': params['filename'],
+        'mimetype': exporter.mimetype
+    }
+    
+    # Export, writing any summary sheet in the same pass
+    summary = SummaryAccumulator()
+    if params.get('store_artifact'):
+        # Build the file in a spooled buffer and hand it to the artifact store
+        buffer = exporter.export_to_buffer(
+            businesses=businesses,
+            accumulator=summary,
+            progress=progress
+        )
+        if buffer is None:
+            raise RuntimeError('No businesses found matching your criteria')
+        
+        artifact = get_artifact_store().put(buffer, params['filename'], exporter.mimetype)
+        result['file_id'] = artifact.id
+    else:
+        # Create temporary file
+        with tempfile.NamedTemporaryFile(suffix=exporter.extension, delete=False) as tmp_file:
+            temp_path = tmp_file.name
+        
+        if not exporter.export(
+            businesses=businesses,
+            filename=temp_path,
+            accumulator=summary,
+            progress=progress
+        ):
+            os.unlink(temp_path)
+            raise RuntimeError('No businesses found matching your criteria')
+        result['path'] = temp_path
+    
+    result['business_count'] = summary.total
+    return result
+
+def register_job_file(job: Job) -> None:
+    """Move a finished job's temporary file into the artifact store under the job id."""
+    if (job.status == FINISHED and 'path' in job.result
+            and os.path.exists(job.result['path']) and artifact_store.get(job.id) is None):
+        artifact_store.put(job.result['path'], job.result['filename'],
+                           job.result['mimetype'], artifact_id=job.id)
+
+# Background workers for /generate, forgetting jobs once their files have expired
+job_queue = JobQueue(run_generate_job, on_complete=register_job_file, initializer=init_worker,
+                     retention=ARTIFACT_TTL_SECONDS)
+
+# Worker processes build their own generator; a forked copy of this one
+# would share its cache connection
+if job_queue.mode == 'thread':
+    init_worker()
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report the status of a queued mailing list."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job_status_data(job))
+
+def job_status_data(job: Job) -> dict:
+    """Public view of a job for the status and event endpoints."""
+    status = job.to_dict()
+    if job.status == FINISHED:
+        # Never expose the server-side path
+        status['result'] = {key: value for key, value in job.result.items() if key != 'path'}
+        status['message'] = f"Found {job.result['business_count']} businesses"
+        status['download_url'] = f'/jobs/{job.id}/download'
+    return status
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream a job's progress as Server-Sent Events."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    
+    try:
+        last_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_id = 0
+    
+    def sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        return f"id: {event_id}\n{message}" if event_id is not None else message
+    
+    def stream():
+        nonlocal last_id
+        progress = job.progress
+        status = None
+        last_sent = time.monotonic()
+        while True:
+            current = job_queue.get(job_id) or job
+            if progress is not None:
+                events = progress.events_after(last_id, timeout=SSE_KEEPALIVE_SECONDS)
+                for event in events:
+                    last_id = event['id']
+                    yield sse(event['event'], event['data'], event['id'])
+                settled = progress.closed and not progress.events_after(last_id, timeout=0)
+            else:
+                # Jobs run in worker processes only report status changes
+                events = [current.status] if current.status != status else []
+                if events:
+                    status = current.status
+                    yield sse('status', {'status': status})
+                settled = current.done
+            
+            if settled:
+                yield sse('done', job_status_data(job_queue.get(job_id) or job))
+                return
+            if events:
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= SSE_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            if progress is None:
+                time.sleep(1)
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/<job_id>/download')
+def download_job_file(job_id):
+    """Download the file produced by a finished job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    if job.status != FINISHED:
+        return jsonify({'error': f'Job is {job.status}', 'status': job.status}), 409
+    
+    # Jobs finished by another worker process are registered on first download
+    register_job_file(job)
+    return download_file(job.result.get('file_id', job_id))
 
 @app.route('/download/<file_id>')
 def download_file(file_id):
-    """Download the generated Excel file."""
+    """Download the generated mailing list file."""
     try:
-        # Check if file exists in storage
-        if file_id not in file_storage:
+        # Files are downloaded once, so take it out of the store
+        artifact = artifact_store.pop(file_id)
+        if artifact is None:
             return jsonify({'error': 'File not found or expired'}), 404
         
-        file_info = file_storage[file_id]
-        file_path = file_info['path']
-        filename = file_info['filename']
-        
-        # Check if file still exists on disk
-        if not os.path.exists(file_path):
-            # Remove from storage if file doesn't exist
-            del file_storage[file_id]
+        try:
+            # Closing the content once the response is sent releases the file
+            content = artifact.open(discard_on_close=True)
+        except OSError:
+            artifact.discard()
             return jsonify({'error': 'File not found on disk'}), 404
         
         # Send file
         response = send_file(
-            file_path,
+            content,
             as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            download_name=artifact.filename,
+            mimetype=artifact.mimetype
         )
         
-        # Schedule file deletion after response is sent
-        @response.call_on_close
-        def cleanup():
-            try:
-                if os.path.exists(file_path):
-                    os.unlink(file_path)
-                if file_id in file_storage:
-                    del file_storage[file_id]
-            except:
-                pass
-        
         return response
         
     except Exception as e:
@@ -190,8 +321,20 @@ def download_file(file_id):
 @app.route('/categories')
 def get_categories():
     """API endpoint to get available categories."""
-    categories = load_categories()
-    return jsonify(categories)
+    snapshot = get_category_registry().snapshot()
+    response = Response(snapshot.payload, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    return response.make_conditional(request)
+
+@app.route('/categories/suggest')
+def suggest_categories():
+    """API endpoint for category type-ahead."""
+    query = request.args.get('q', '')
+    try:
+        k = max(1, min(int(request.args.get('k', 10)), 50))
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+    return jsonify(get_category_registry().suggest(query, k=k))
 
 @app.route('/health')
 def health_check():
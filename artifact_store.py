@@ -0,0 +1,499 @@
+import heapq
+import io
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Optional, Union
+from shared_instance import SharedInstance
+from config import (ARTIFACT_STORE_DIR, ARTIFACT_TTL_SECONDS, ARTIFACT_MAX_BYTES,
+                    ARTIFACT_MAX_ITEM_BYTES, ARTIFACT_REAP_INTERVAL)
+
+class ArtifactTooLarge(ValueError):
+    """Raised when a single artifact is over the per-item size cap."""
+
+class Artifact:
+    """
+    A generated file waiting to be downloaded.
+
+    The content is either an open binary buffer or a file on disk.
+    """
+
+    def __init__(self,
+                 artifact_id: str,
+                 filename: str,
+                 mimetype: str,
+                 size: int,
+                 expires_at: float,
+                 buffer: Optional[BinaryIO] = None,
+                 path: Optional[str] = None):
+        self.id = artifact_id
+        self.filename = filename
+        self.mimetype = mimetype
+        self.size = size
+        self.expires_at = expires_at
+        self.buffer = buffer
+        self.path = path
+
+    def open(self, discard_on_close: bool = False) -> BinaryIO:
+        """
+        Binary file object positioned at the start of the content.
+
+        Args:
+            discard_on_close: Release the content when the file object is
+                closed, e.g. by send_file once the response is sent
+
+        Returns:
+            Readable binary file object
+        """
+        if self.buffer is not None:
+            # Closing a buffer already releases it
+            self.buffer.seek(0)
+            return self.buffer
+        if discard_on_close:
+            return _DiscardingReader(self)
+        return open(self.path, 'rb')
+
+    def discard(self) -> None:
+        """Release the content. Safe to call more than once."""
+        try:
+            if self.buffer is not None:
+                self.buffer.close()
+            elif self.path and os.path.exists(self.path):
+                os.unlink(self.path)
+        except OSError as e:
+            print(f"Error discarding artifact {self.id}: {e}")
+
+class _DiscardingReader(io.BufferedReader):
+    """Reader over an artifact's file that deletes the file once closed."""
+
+    def __init__(self, artifact: Artifact):
+        super().__init__(io.FileIO(artifact.path, 'rb'))
+        self._artifact = artifact
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._artifact.discard()
+
+def _size_of(content: Union[BinaryIO, str]) -> int:
+    """Size in bytes of a buffer or file path."""
+    if isinstance(content, str):
+        return os.path.getsize(content)
+    position = content.tell()
+    content.seek(0, os.SEEK_END)
+    size = content.tell()
+    content.seek(position)
+    return size
+
+class ArtifactStore:
+    """
+    Bounded, thread-safe in-memory store for generated files.
+
+    Artifacts are kept in LRU order alongside a heap of expiry times, so
+    expired items are found in O(log n) without scanning. Each artifact is
+    capped at max_item_bytes, and the least recently used ones are evicted
+    once the total passes max_bytes. A daemon thread reaps expired
+    artifacts every reap_interval seconds.
+
+    Memory stores are private to one process; use DiskArtifactStore when
+    several worker processes must see the same artifacts.
+    """
+
+    # Whether other processes can read artifacts put here
+    shared = False
+
+    def __init__(self,
+                 ttl: float = ARTIFACT_TTL_SECONDS,
+                 max_bytes: int = ARTIFACT_MAX_BYTES,
+                 max_item_bytes: int = ARTIFACT_MAX_ITEM_BYTES,
+                 reap_interval: float = ARTIFACT_REAP_INTERVAL):
+        """
+        Initialize an empty store.
+
+        Args:
+            ttl: Default seconds an artifact stays downloadable
+            max_bytes: Total size above which the least recently used artifacts are evicted
+            max_item_bytes: Largest single artifact accepted
+            reap_interval: Seconds between background sweeps for expired artifacts
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.reap_interval = reap_interval
+
+        self._items = OrderedDict()
+        self._expiry = []  # (expires_at, artifact_id), stale entries skipped lazily
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self._reaper = None
+        self._stopped = threading.Event()
+
+    def put(self,
+            content: Union[BinaryIO, str],
+            filename: str,
+            mimetype: str,
+            artifact_id: Optional[str] = None,
+            ttl: Optional[float] = None) -> Artifact:
+        """
+        Store a buffer or a file on disk, taking ownership of it.
+
+        Args:
+            content: Seekable binary buffer, or path to a file
+            filename: Name offered to the browser on download
+            mimetype: Content type for the download
+            artifact_id: Id to store it under (a new UUID by default)
+            ttl: Seconds it stays downloadable (the store's ttl by default)
+
+        Returns:
+            The stored artifact
+
+        Raises:
+            ArtifactTooLarge: If the content is over max_item_bytes
+        """
+        size = _size_of(content)
+        if size > self.max_item_bytes:
+            self._release(content)
+            raise ArtifactTooLarge(f"File is {size} bytes; the limit is {self.max_item_bytes} bytes")
+
+        artifact = Artifact(
+            artifact_id=artifact_id or str(uuid.uuid4()),
+            filename=filename,
+            mimetype=mimetype,
+            size=size,
+            expires_at=time.time() + (self.ttl if ttl is None else ttl),
+            buffer=None if isinstance(content, str) else content,
+            path=content if isinstance(content, str) else None
+        )
+
+        evicted = []
+        with self._lock:
+            previous = self._items.pop(artifact.id, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+                evicted.append(previous)
+
+            self._items[artifact.id] = artifact
+            self._total_bytes += artifact.size
+            heapq.heappush(self._expiry, (artifact.expires_at, artifact.id))
+
+            while self._total_bytes > self.max_bytes and len(self._items) > 1:
+                _, oldest = self._items.popitem(last=False)
+                self._total_bytes -= oldest.size
+                evicted.append(oldest)
+
+        for old in evicted:
+            old.discard()
+        self._start_reaper()
+        return artifact
+
+    @staticmethod
+    def _release(content: Union[BinaryIO, str]) -> None:
+        """Dispose of content the store refused."""
+        if isinstance(content, str):
+            if os.path.exists(content):
+                os.unlink(content)
+        else:
+            content.close()
+
+    def get(self, artifact_id: str) -> Optional[Artifact]:
+        """
+        Look up an artifact, marking it recently used.
+
+        Returns:
+            The artifact, or None if it is unknown or expired
+        """
+        with self._lock:
+            artifact = self._items.get(artifact_id)
+            if artifact is None:
+                return None
+            if artifact.expires_at > time.time():
+                self._items.move_to_end(artifact_id)
+                return artifact
+            self._remove(artifact_id)
+        artifact.discard()
+        return None
+
+    def pop(self, artifact_id: str) -> Optional[Artifact]:
+        """
+        Remove an artifact and hand it to the caller, who must discard it.
+
+        Returns:
+            The artifact, or None if it is unknown or expired
+        """
+        with self._lock:
+            artifact = self._remove(artifact_id)
+        if artifact is not None and artifact.expires_at <= time.time():
+            artifact.discard()
+            return None
+        return artifact
+
+    def delete(self, artifact_id: str) -> None:
+        """Remove and discard an artifact."""
+        with self._lock:
+            artifact = self._remove(artifact_id)
+        if artifact is not None:
+            artifact.discard()
+
+    def _remove(self, artifact_id: str) -> Optional[Artifact]:
+        """Drop an artifact from the index. Caller holds the lock."""
+        artifact = self._items.pop(artifact_id, None)
+        if artifact is not None:
+            self._total_bytes -= artifact.size
+        return artifact
+
+    def reap(self) -> int:
+        """
+        Discard every expired artifact.
+
+        Returns:
+            Number of artifacts discarded
+        """
+        now = time.time()
+        expired = []
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, artifact_id = heapq.heappop(self._expiry)
+                artifact = self._items.get(artifact_id)
+                # Skip heap entries for artifacts since removed or replaced
+                if artifact is not None and artifact.expires_at == expires_at:
+                    expired.append(self._remove(artifact_id))
+
+            # Drop stale heap entries once they outnumber live artifacts
+            if len(self._expiry) > 2 * len(self._items) + 64:
+                self._expiry = [(artifact.expires_at, artifact.id) for artifact in self._items.values()]
+                heapq.heapify(self._expiry)
+
+        for artifact in expired:
+            artifact.discard()
+        return len(expired)
+
+    def stats(self) -> Dict:
+        """Artifact count and total size."""
+        with self._lock:
+            return {'artifacts': len(self._items), 'bytes': self._total_bytes}
+
+    def _start_reaper(self) -> None:
+        """Start the background reaper on first use."""
+        if self._reaper is not None or self.reap_interval <= 0:
+            return
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_loop, name='artifact-reaper', daemon=True)
+                self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        while not self._stopped.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"Error reaping artifacts: {e}")
+
+    def close(self) -> None:
+        """Stop the reaper and discard every artifact."""
+        self._stopped.set()
+        with self._lock:
+            artifacts = list(self._items.values())
+            self._items.clear()
+            self._expiry = []
+            self._total_bytes = 0
+        for artifact in artifacts:
+            artifact.discard()
+
+class DiskArtifactStore(ArtifactStore):
+    """
+    Artifact store kept in a local directory, shared by worker processes.
+
+    Contents are files in the directory and metadata lives in a SQLite
+    index next to them, so any process on the machine can find, download
+    or reap an artifact another one stored. Expiry and LRU order come from
+    indexed columns, keeping both lookups O(log n).
+    """
+
+    shared = True
+
+    def __init__(self,
+                 directory: str = ARTIFACT_STORE_DIR,
+                 ttl: float = ARTIFACT_TTL_SECONDS,
+                 max_bytes: int = ARTIFACT_MAX_BYTES,
+                 max_item_bytes: int = ARTIFACT_MAX_ITEM_BYTES,
+                 reap_interval: float = ARTIFACT_REAP_INTERVAL):
+        """
+        Open (or create) the store directory and its index.
+
+        Args:
+            directory: Directory holding artifact files and artifacts.sqlite
+            ttl: Default seconds an artifact stays downloadable
+            max_bytes: Total size above which the least recently used artifacts are evicted
+            max_item_bytes: Largest single artifact accepted
+            reap_interval: Seconds between background sweeps for expired artifacts
+        """
+        super().__init__(ttl, max_bytes, max_item_bytes, reap_interval)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(directory, 'artifacts.sqlite'),
+                                     check_same_thread=False, timeout=30, isolation_level=None)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    mimetype TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    path TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_artifacts_expires ON artifacts (expires_at)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_artifacts_accessed ON artifacts (accessed_at)')
+
+    def _transaction(self):
+        """Lock the index against other processes for a read-modify-write."""
+        self._conn.execute('BEGIN IMMEDIATE')
+
+    def put(self,
+            content: Union[BinaryIO, str],
+            filename: str,
+            mimetype: str,
+            artifact_id: Optional[str] = None,
+            ttl: Optional[float] = None) -> Artifact:
+        size = _size_of(content)
+        if size > self.max_item_bytes:
+            self._release(content)
+            raise ArtifactTooLarge(f"File is {size} bytes; the limit is {self.max_item_bytes} bytes")
+
+        artifact_id = artifact_id or str(uuid.uuid4())
+        path = os.path.join(self.directory, f"{artifact_id}{os.path.splitext(filename)[1]}")
+
+        # Move the content into the store before it becomes visible
+        if isinstance(content, str):
+            shutil.move(content, path)
+        else:
+            content.seek(0)
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(content, f)
+            content.close()
+
+        now = time.time()
+        artifact = Artifact(artifact_id, filename, mimetype, size,
+                            now + (self.ttl if ttl is None else ttl), path=path)
+
+        evicted = []
+        with self._lock:
+            self._transaction()
+            try:
+                evicted += self._delete_rows('id = ?', (artifact_id,))
+                self._conn.execute('INSERT INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                   (artifact_id, filename, mimetype, size, path, artifact.expires_at, now))
+
+                total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM artifacts').fetchone()[0]
+                while total > self.max_bytes:
+                    row = self._conn.execute(
+                        'SELECT id, size FROM artifacts WHERE id != ? ORDER BY accessed_at LIMIT 1',
+                        (artifact_id,)).fetchone()
+                    if row is None:
+                        break
+                    evicted += self._delete_rows('id = ?', (row[0],))
+                    total -= row[1]
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        for old in evicted:
+            # A replaced artifact may have shared this path
+            if old.path != path:
+                old.discard()
+        self._start_reaper()
+        return artifact
+
+    def _delete_rows(self, where: str, args: tuple) -> list:
+        """Delete matching index rows, returning their artifacts. Caller holds a transaction."""
+        rows = self._conn.execute(
+            f'SELECT id, filename, mimetype, size, path, expires_at FROM artifacts WHERE {where}',
+            args).fetchall()
+        self._conn.execute(f'DELETE FROM artifacts WHERE {where}', args)
+        return [Artifact(row[0], row[1], row[2], row[3], row[5], path=row[4]) for row in rows]
+
+    def get(self, artifact_id: str) -> Optional[Artifact]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, filename, mimetype, size, path, expires_at FROM artifacts '
+                'WHERE id = ? AND expires_at > ?', (artifact_id, now)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE artifacts SET accessed_at = ? WHERE id = ?', (now, artifact_id))
+        return Artifact(row[0], row[1], row[2], row[3], row[5], path=row[4])
+
+    def pop(self, artifact_id: str) -> Optional[Artifact]:
+        with self._lock:
+            self._transaction()
+            try:
+                artifacts = self._delete_rows('id = ?', (artifact_id,))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        if not artifacts:
+            return None
+        artifact = artifacts[0]
+        if artifact.expires_at <= time.time():
+            artifact.discard()
+            return None
+        return artifact
+
+    def delete(self, artifact_id: str) -> None:
+        artifact = self.pop(artifact_id)
+        if artifact is not None:
+            artifact.discard()
+
+    def reap(self) -> int:
+        with self._lock:
+            self._transaction()
+            try:
+                expired = self._delete_rows('expires_at <= ?', (time.time(),))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        for artifact in expired:
+            artifact.discard()
+        return len(expired)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts').fetchone()
+        return {'artifacts': count, 'bytes': total}
+
+    def close(self) -> None:
+        """Stop the reaper and close the index; stored files are left for other processes."""
+        self._stopped.set()
+        with self._lock:
+            self._conn.close()
+
+# Process-wide store used by the web app
+_shared_artifact_store = SharedInstance(
+    lambda: DiskArtifactStore(ARTIFACT_STORE_DIR) if ARTIFACT_STORE_DIR else ArtifactStore(),
+    per_process=True)
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Return the process-wide artifact store, creating it on first use.
+
+    A DiskArtifactStore is used when ARTIFACT_STORE_DIR is set, otherwise
+    an in-memory ArtifactStore. Forked worker processes get their own
+    instance rather than the parent's SQLite connection.
+    """
+    return _shared_artifact_store.get()
@@ -0,0 +1,260 @@
+import asyncio
+import aiohttp
+from typing import List, Dict, AsyncIterator, Optional, Tuple
+from config import (YELP_API_KEY, YELP_BASE_URL, DEFAULT_LIMIT, MAX_RESULTS,
+                    HTTP_POOL_MAXSIZE, HTTP_KEEP_ALIVE, HTTP_COMPRESSION,
+                    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, ASYNC_MAX_CONCURRENCY)
+from rate_limiter import RateLimiter, DailyBudgetExceeded, get_shared_rate_limiter
+from response_cache import ResponseCache, USE_SHARED_CACHE, get_shared_response_cache
+
+class AsyncYelpAPIClient:
+    def __init__(self, api_key: Optional[str] = None,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = USE_SHARED_CACHE,
+                 base_url: Optional[str] = None,
+                 timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
+        """
+        Initialize asyncio Yelp API client with API key.
+
+        Args:
+            api_key: Yelp API key (defaults to YELP_API_KEY)
+            session: aiohttp session to use (created lazily if omitted)
+            max_concurrency: Maximum requests in flight across all calls on this client
+            rate_limiter: Rate limiter to use (defaults to the shared limiter)
+            cache: Response cache to use (defaults to the shared cache, if enabled;
+                None disables caching)
+            base_url: API root URL (defaults to YELP_BASE_URL)
+            timeout: (connect, read) timeouts in seconds for each request
+        """
+        self.api_key = api_key or YELP_API_KEY
+        if not self.api_key:
+            raise ValueError("Yelp API key is required. Set YELP_API_KEY environment variable.")
+
+        self.headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        self.session = session
+        self._owns_session = session is None
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.cache = get_shared_response_cache() if cache is USE_SHARED_CACHE else cache
+        self.base_url = (base_url or YELP_BASE_URL).rstrip('/')
+        self.timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+
+    async def __aenter__(self) -> 'AsyncYelpAPIClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the client's session if the client created it."""
+        if self.session is not None and self._owns_session:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=HTTP_POOL_MAXSIZE,
+                                             force_close=not HTTP_KEEP_ALIVE)
+            headers = {'Accept-Encoding': 'gzip, deflate' if HTTP_COMPRESSION else 'identity'}
+            self.session = aiohttp.ClientSession(connector=connector, headers=headers)
+        return self.session
+
+    async def _get(self, path: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Issue a rate-limited GET under the client's concurrency limit.
+
+        Args:
+            path: Endpoint path relative to the base URL
+            params: Query parameters
+
+        Returns:
+            Decoded response body or None if the request failed
+        """
+        # Cache by full URL so responses from different servers never mix
+        url = f'{self.base_url}{path}'
+        if self.cache is not None:
+            # SQLite calls block, so keep them off the event loop
+            cached = await asyncio.to_thread(self.cache.get, url, params)
+            if cached is not None:
+                return cached
+
+        session = self._get_session()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    await self.rate_limiter.acquire_async()
+                    async with session.get(url,
+                                           headers=self.headers,
+                                           params=params,
+                                           timeout=self.timeout) as response:
+                        self.rate_limiter.update_from_headers(response.headers)
+                        if response.status == 200:
+                            data = await response.json()
+                            if self.cache is not None:
+                                await asyncio.to_thread(self.cache.set, url, params, data)
+                            return data
+                        text = await response.text()
+
+                if response.status == 429:
+                    delay = self.rate_limiter.backoff(attempt, response.headers)
+                    if delay is None:
+                        print("Rate limit exceeded. Giving up after retries.")
+                        return None
+                    print(f"Rate limit exceeded. Retrying in {delay:.1f}s...")
+                    attempt += 1
+                    continue
+                print(f"API Error: {response.status} - {text}")
+                return None
+
+            except DailyBudgetExceeded as e:
+                print(f"Rate limit error: {e}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Request error: {e}")
+                return None
+
+    async def search_businesses(self,
+                                location: str,
+                                business_type: Optional[str] = None,
+                                radius: int = 40000,  # 40km radius
+                                limit: int = DEFAULT_LIMIT,
+                                max_results: int = MAX_RESULTS) -> List[Dict]:
+        """
+        Search for businesses using Yelp API.
+
+        The first page is fetched alone to learn the total; the remaining
+        offsets are then requested together and reassembled in order.
+
+        Args:
+            location: City, state, or ZIP code
+            business_type: Category of business to search for
+            radius: Search radius in meters
+            limit: Number of results per request
+            max_results: Maximum total results to collect
+
+        Returns:
+            List of business dictionaries
+        """
+        return [business async for business in
+                self.iter_businesses(location, business_type, radius, limit, max_results)]
+
+    async def iter_businesses(self,
+                              location: str,
+                              business_type: Optional[str] = None,
+                              radius: int = 40000,
+                              limit: int = DEFAULT_LIMIT,
+                              max_results: int = MAX_RESULTS) -> AsyncIterator[Dict]:
+        """
+        Stream search results one business at a time as pages arrive.
+
+        Takes the same arguments as search_businesses.
+
+        Yields:
+            Business dictionaries in offset order
+        """
+        async for page in self.iter_pages(location, business_type, radius, limit, max_results):
+            for business in page:
+                yield business
+
+    async def iter_pages(self,
+                         location: str,
+                         business_type: Optional[str] = None,
+                         radius: int = 40000,
+                         limit: int = DEFAULT_LIMIT,
+                         max_results: int = MAX_RESULTS) -> AsyncIterator[List[Dict]]:
+        """
+        Stream search results page by page as they arrive.
+
+        Takes the same arguments as search_businesses. Pages are yielded in
+        offset order; a failed or empty page ends the stream.
+
+        Yields:
+            Lists of business dictionaries
+        """
+        base_params = {
+            'location': location,
+            'radius': radius
+        }
+
+        # Add category filter if specified
+        if business_type:
+            base_params['categories'] = business_type
+
+        first_page = await self._get('/businesses/search',
+                                     dict(base_params, limit=min(limit, max_results), offset=0))
+        businesses = (first_page or {}).get('businesses', [])[:max_results]
+        if not businesses:
+            return
+        yield businesses
+
+        # Yelp rejects offset + limit beyond its result ceiling
+        target = min(first_page.get('total', len(businesses)), max_results, MAX_RESULTS)
+        tasks = [
+            asyncio.ensure_future(self._get(
+                '/businesses/search',
+                dict(base_params, limit=min(limit, target - offset), offset=offset)))
+            for offset in range(len(businesses), target, limit)
+        ]
+
+        try:
+            for task in tasks:
+                page = await task
+                new_businesses = page.get('businesses', []) if page else []
+                if not new_businesses:
+                    return
+                yield new_businesses
+        finally:
+            # An empty page or an abandoned generator leaves later offsets unread
+            for task in tasks:
+                task.cancel()
+
+    async def get_business_details(self, business_id: str) -> Optional[Dict]:
+        """
+        Get detailed information for a specific business.
+
+        Args:
+            business_id: Yelp business ID
+
+        Returns:
+            Business details dictionary or None if error
+        """
+        return await self._get(f'/businesses/{business_id}')
+
+    async def search_by_coordinates(self,
+                                    latitude: float,
+                                    longitude: float,
+                                    business_type: Optional[str] = None,
+                                    radius: int = 40000,
+                                    limit: int = DEFAULT_LIMIT) -> List[Dict]:
+        """
+        Search for businesses using coordinates.
+
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            business_type: Category of business to search for
+            radius: Search radius in meters
+            limit: Number of results per request
+
+        Returns:
+            List of business dictionaries
+        """
+        params = {
+            'latitude': latitude,
+            'longitude': longitude,
+            'radius': radius,
+            'limit': limit
+        }
+
+        if business_type:
+            params['categories'] = business_type
+
+        data = await self._get('/businesses/search', params)
+        return data.get('businesses', []) if data else []
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Batch Mailing List Generator
+
+Runs many location x category searches from a jobs file without any
+prompts. Jobs run concurrently and share one Yelp API client, so they
+share its connection pool, rate limiter and response cache.
+
+Jobs files are CSV (with a header row) or JSON Lines, one job per row:
+
+    location,category,radius,max_results
+    "Nashville, TN",chiropractors,10,200
+    37064,restaurants,5,100
+
+location is required. category accepts a Yelp alias or title (blank for
+all types), radius is in miles (default 25) and max_results defaults to
+100. Optional columns: filename, include_subcategories, enrich.
+
+Usage:
+    python batch.py jobs.csv [--format csv] [--workers 4]
+    python batch.py jobs.jsonl --merge territories.xlsx
+    python batch.py jobs.csv --incremental
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from main import MailingListGenerator
+from exporters import EXPORTERS
+from summary_accumulator import SummaryAccumulator
+from deduplication import BusinessDeduplicator
+from category_registry import get_category_registry
+from config import BATCH_MAX_WORKERS
+
+METERS_PER_MILE = 1609
+MAX_RADIUS_METERS = 40000
+DEFAULT_RADIUS_MILES = 25
+DEFAULT_MAX_RESULTS = 100
+
+def load_jobs(path: str) -> Tuple[List[Dict], List[str]]:
+    """
+    Read and validate a jobs file.
+
+    Args:
+        path: CSV or JSON Lines jobs file
+
+    Returns:
+        Tuple of (valid job parameter dictionaries, error messages)
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson', '.json')):
+            rows = []
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        rows.append((line_number, json.loads(line)))
+                    except json.JSONDecodeError as e:
+                        rows.append((line_number, e))
+        else:
+            # Header is line 1
+            rows = list(enumerate(csv.DictReader(f), 2))
+
+    jobs = []
+    errors = []
+    for line_number, row in rows:
+        try:
+            if isinstance(row, Exception):
+                raise ValueError(f"invalid JSON ({row})")
+            jobs.append(parse_job(row))
+        except ValueError as e:
+            errors.append(f"Line {line_number}: {e}")
+    return jobs, errors
+
+def parse_job(row: Dict) -> Dict:
+    """
+    Turn one jobs-file row into search parameters.
+
+    Args:
+        row: Raw row with location, category, radius and max_results
+
+    Returns:
+        Parameter dictionary as used by MailingListGenerator.search_and_export
+
+    Raises:
+        ValueError: If a field is missing or invalid
+    """
+    row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+
+    location = str(row.get('location') or '').strip()
+    if not location:
+        raise ValueError("location is required")
+
+    category = str(row.get('category') or '').strip()
+    business_type = None
+    if category:
+        business_type = get_category_registry().match(category)
+        if not business_type:
+            raise ValueError(f"no Yelp category matches '{category}'")
+
+    try:
+        radius_miles = float(row.get('radius') or DEFAULT_RADIUS_MILES)
+        max_results = int(row.get('max_results') or DEFAULT_MAX_RESULTS)
+    except (TypeError, ValueError):
+        raise ValueError("radius and max_results must be numbers")
+    if radius_miles <= 0 or max_results <= 0:
+        raise ValueError("radius and max_results must be positive")
+
+    return {
+        'location': location,
+        'business_type': business_type,
+        'include_subcategories': _flag(row.get('include_subcategories')),
+        'enrich': _flag(row.get('enrich')),
+        'radius': min(int(radius_miles * METERS_PER_MILE), MAX_RADIUS_METERS),
+        'max_results': max_results,
+        'filename': str(row.get('filename') or '').strip() or None
+    }
+
+def _flag(value) -> bool:
+    """Read a yes/no jobs-file column."""
+    return str(value or '').strip().lower() in ('1', 'true', 'yes', 'y')
+
+def job_filename(index: int, params: Dict) -> str:
+    """Default output name for a job, unique within the batch."""
+    slug = re.sub(r'[^a-z0-9]+', '_', f"{params['location']} {params['business_type'] or 'all'}".lower())
+    return f"{index:03d}_{slug.strip('_')}"
+
+class BatchRunner:
+    """Runs batch jobs concurrently through one shared MailingListGenerator."""
+
+    def __init__(self,
+                 generator: MailingListGenerator,
+                 output_format: str = 'xlsx',
+                 max_workers: int = BATCH_MAX_WORKERS,
+                 incremental: bool = False):
+        """
+        Initialize the batch runner.
+
+        Args:
+            generator: Generator whose client and formatting every job shares
+            output_format: One of the keys of EXPORTERS
+            max_workers: Jobs run at once
+            incremental: Export only what changed since each job's last run
+        """
+        self.generator = generator
+        self.output_format = output_format
+        self.max_workers = max(1, max_workers)
+        self.incremental = incremental
+
+    def run_separate(self, jobs: List[Dict]) -> List[Dict]:
+        """
+        Write one output file per job.
+
+        Args:
+            jobs: Job parameter dictionaries
+
+        Returns:
+            One report per job with 'businesses', 'files' and 'error'
+        """
+        def run(index: int, params: Dict) -> Dict:
+            filename = params['filename'] or job_filename(index, params)
+            if self.incremental:
+                delta, paths = self.generator.refresh_and_export(
+                    dict(params, filename=filename, output_format=self.output_format),
+                    concurrent=False
+                )
+                counts = delta.to_dict()
+                return {
+                    'businesses': delta.unchanged + counts['new'] + counts['changed'],
+                    'changes': f"{counts['new']} new, {counts['changed']} changed, {counts['closed']} closed",
+                    'files': list(paths.values())
+                }
+
+            accumulator = SummaryAccumulator()
+            exporter = self.generator.exporter_for(dict(params, output_format=self.output_format))
+            filepath = exporter.export(
+                businesses=self.generator.iter_search(params, concurrent=False),
+                filename=filename,
+                accumulator=accumulator
+            )
+            return {'businesses': accumulator.total, 'files': [filepath] if filepath else []}
+
+        return self._run_all(jobs, run)
+
+    def run_merged(self, jobs: List[Dict], filename: Optional[str] = None) -> Tuple[List[Dict], str]:
+        """
+        Write every job's results into one file, keeping each business once.
+
+        Businesses are deduplicated by Yelp id and by phone number and
+        address, so a business listed twice under different ids is also
+        kept once.
+
+        Args:
+            jobs: Job parameter dictionaries
+            filename: Output filename for the merged file
+
+        Returns:
+            Tuple of (one report per job, path of the merged file or "")
+        """
+        def run(index: int, params: Dict) -> Dict:
+            businesses = list(self.generator.iter_search(params, concurrent=False))
+            return {'businesses': len(businesses), 'results': businesses}
+
+        reports = self._run_all(jobs, run)
+
+        # Merge in job order so the first job to find a business keeps it
+        deduplicator = BusinessDeduplicator()
+        merged = list(deduplicator.iter_unique(
+            business for report in reports for business in report.pop('results', [])))
+
+        stats = deduplicator.stats()
+        total = sum(report['businesses'] for report in reports)
+        print(f"\n🔗 Merged {total} results into {len(merged)} unique businesses "
+              f"({stats['duplicate_ids']} repeated ids, {stats['near_duplicates']} near-duplicates)")
+        exporter = self.generator.exporter_for({
+            'output_format': self.output_format,
+            'enrich': any(params.get('enrich') for params in jobs)
+        })
+        filepath = exporter.export(merged, filename or 'batch_merged')
+        return reports, filepath
+
+    def _run_all(self, jobs: List[Dict], run) -> List[Dict]:
+        """Run every job on the pool, returning reports in job order."""
+        def guarded(index: int, params: Dict) -> Dict:
+            try:
+                report = run(index, params)
+                report['error'] = None
+            except Exception as e:
+                report = {'businesses': 0, 'files': [], 'error': str(e)}
+            if report['error']:
+                status = f"❌ {report['error']}"
+            elif 'changes' in report:
+                status = f"✅ {report['changes']}"
+            else:
+                status = f"✅ {report['businesses']} businesses"
+            print(f"[{index}/{len(jobs)}] {params['location']} / {params['business_type'] or 'all types'}: {status}")
+            return report
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(guarded, index, params) for index, params in enumerate(jobs, 1)]
+            return [future.result() for future in futures]
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate many mailing lists from a jobs file.")
+    parser.add_argument('jobs_file', help="CSV or JSON Lines file of location, category, radius, max_results")
+    parser.add_argument('--format', dest='output_format', default='xlsx', choices=list(EXPORTERS),
+                        help="Output format (default: xlsx)")
+    parser.add_argument('--merge', metavar='FILENAME', nargs='?', const='batch_merged',
+                        help="Write one merged file, keeping each business once, instead of one file per job")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only export businesses that are new, changed or closed since each job's last run")
+    parser.add_argument('--workers', type=int, default=BATCH_MAX_WORKERS,
+                        help=f"Jobs run at once (default: {BATCH_MAX_WORKERS})")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Batch entry point."""
+    args = parse_args(argv)
+
+    if not os.path.exists(args.jobs_file):
+        print(f"❌ Jobs file not found: {args.jobs_file}")
+        sys.exit(1)
+
+    jobs, errors = load_jobs(args.jobs_file)
+    if errors:
+        print("❌ Invalid jobs file:")
+        for error in errors:
+            print(f"  {error}")
+        sys.exit(1)
+    if not jobs:
+        print("❌ The jobs file has no jobs.")
+        sys.exit(1)
+
+    try:
+        generator = MailingListGenerator()
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        print("Please make sure your YELP_API_KEY is set in the .env file")
+        sys.exit(1)
+    if args.incremental and args.merge:
+        print("❌ --incremental writes one delta per job and can't be combined with --merge.")
+        sys.exit(1)
+    runner = BatchRunner(generator, args.output_format, args.workers, args.incremental)
+
+    print(f"\n🚀 Running {len(jobs)} jobs with {runner.max_workers} workers...")
+    if args.merge:
+        reports, merged_path = runner.run_merged(jobs, args.merge)
+    else:
+        reports = runner.run_separate(jobs)
+        merged_path = None
+
+    failed = [report for report in reports if report['error']]
+    print("\n" + "=" * 50)
+    print(f"🎉 {len(reports) - len(failed)} of {len(reports)} jobs succeeded")
+    for index, report in enumerate(reports, 1):
+        for path in report.get('files', []):
+            print(f"📁 Job {index}: {os.path.abspath(path)}")
+    if merged_path:
+        print(f"📁 Merged file: {os.path.abspath(merged_path)}")
+    elif merged_path == "":
+        print("❌ No businesses found for any job.")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end search_and_export against the offline stub server
+
+Serves synthetic businesses from yelp_stub_server.py and runs
+MailingListGenerator.search_and_export over all of them, reporting
+throughput, per-page search latency, export time and peak RSS at each
+size. Searches over 1000 results go through the tiled search, as they do
+against Yelp. Each size runs in a fresh subprocess so its peak RSS is its
+own.
+
+Results can be saved as JSON and later runs compared against them, failing
+when throughput drops or time or memory grows by more than the tolerance.
+
+Usage:
+    python benchmarks/bench_end_to_end.py [--sizes 100,1000,10000,100000]
+    python benchmarks/bench_end_to_end.py --latency 0.02 --rate-429 0.01
+    python benchmarks/bench_end_to_end.py --output baseline.json
+    python benchmarks/bench_end_to_end.py --baseline baseline.json --tolerance 0.25
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yelp_stub_server import StubYelpServer
+from yelp_api_client import YelpAPIClient, create_session
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from main import MailingListGenerator
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+
+# Metrics compared with a baseline, and whether higher is better
+REGRESSION_METRICS = {
+    'businesses_per_second': True,
+    'page_p95_ms': False,
+    'export_seconds': False,
+    'peak_rss_mb': False
+}
+
+# Changes smaller than these are timer and allocator noise, whatever the ratio
+NOISE_FLOORS = {
+    'businesses_per_second': 0.0,
+    'page_p95_ms': 2.0,
+    'export_seconds': 0.05,
+    'peak_rss_mb': 10.0
+}
+
+class CountingGenerator(MailingListGenerator):
+    """Mailing list generator that counts the businesses its searches yield."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.businesses = 0
+
+    def iter_search(self, params, concurrent=True, progress=None):
+        for business in super().iter_search(params, concurrent, progress):
+            self.businesses += 1
+            yield business
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers, or 0 if it is empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_one(size: int, base_url: str, output_format: str) -> dict:
+    """
+    Time one search_and_export in this process.
+
+    Args:
+        size: Businesses the stub serves, all of which are requested
+        base_url: Stub server base URL
+        output_format: Export format
+
+    Returns:
+        Dictionary of measurements
+    """
+    page_latencies = []
+    throttled = []
+
+    def record(response, *args, **kwargs):
+        if response.status_code == 429:
+            throttled.append(response.url)
+        elif '/businesses/search' in response.url:
+            page_latencies.append(response.elapsed.total_seconds())
+
+    with tempfile.TemporaryDirectory() as directory:
+        # An on-disk cache, like the default one, so cached pages don't count towards RSS,
+        # big enough that the export-only pass never has to search again
+        session = create_session()
+        session.hooks['response'].append(record)
+        client = YelpAPIClient(api_key='benchmark',
+                               base_url=base_url,
+                               session=session,
+                               rate_limiter=RateLimiter(requests_per_second=1000, daily_budget=10 ** 9),
+                               cache=ResponseCache(os.path.join(directory, 'responses.sqlite'),
+                                                   max_entries=10 ** 7))
+        generator = CountingGenerator(yelp_client=client)
+
+        params = {
+            'location': 'Benchmark City',
+            'business_type': None,
+            'include_subcategories': False,
+            'radius': 40000,
+            'max_results': size,
+            'filename': os.path.join(directory, 'search_and_export'),
+            'output_format': output_format,
+            'enrich': False
+        }
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            generator.search_and_export(params)
+            total_seconds = time.perf_counter() - start
+            searched = generator.businesses
+            search_pages, search_throttled = list(page_latencies), len(throttled)
+            peak_rss = peak_rss_mb()
+
+            # Export the same results again, now answered from the response cache
+            businesses = list(generator.iter_search(params))
+            exporter = generator.exporter_for(params)
+            start = time.perf_counter()
+            exporter.export(businesses, filename=os.path.join(directory, 'export_only'))
+            export_seconds = time.perf_counter() - start
+
+        client.cache.close()
+
+    return {
+        'size': size,
+        'businesses': searched,
+        'seconds': round(total_seconds, 3),
+        'businesses_per_second': round(searched / total_seconds, 1) if total_seconds else 0.0,
+        'pages': len(search_pages),
+        'page_p50_ms': round(percentile(search_pages, 0.50) * 1000, 2),
+        'page_p95_ms': round(percentile(search_pages, 0.95) * 1000, 2),
+        'throttled': search_throttled,
+        'export_seconds': round(export_seconds, 3),
+        'peak_rss_mb': round(peak_rss, 1)
+    }
+
+def measure(size: int, args: argparse.Namespace) -> dict:
+    """Serve size businesses and measure a run in a fresh subprocess."""
+    stub = StubYelpServer(businesses=size,
+                          latency=args.latency,
+                          jitter=args.jitter,
+                          rate_429=args.rate_429,
+                          retry_after=args.retry_after)
+    with stub:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-one', str(size),
+             '--base-url', stub.url, '--format', args.format],
+            capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"run at {size:,} businesses failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """
+    Compare results with a saved baseline.
+
+    Args:
+        results: Measurements from this run
+        baseline: Measurements loaded from a previous --output file
+        tolerance: Allowed relative change, e.g. 0.2 for 20%
+
+    Returns:
+        Descriptions of every regression found
+    """
+    previous = {result['size']: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result['size'])
+        if before is None:
+            continue
+        for metric, higher_is_better in REGRESSION_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            if abs(new - old) < NOISE_FLOORS[metric]:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{result['size']:,} businesses: {metric} {old} → {new} ({change:+.0%})")
+    return regressions
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark search_and_export against the offline stub server.")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated business counts (default: 100,1000,10000,100000)")
+    parser.add_argument('--format', default='csv', help="Export format (default: csv)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds the stub adds to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many extra seconds per response")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="Share of requests answered with HTTP 429")
+    parser.add_argument('--retry-after', type=float, default=0.0, help="Retry-After seconds sent with each 429")
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="Fail on regressions against this results JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed relative regression against the baseline (default: 0.2)")
+    parser.add_argument('--run-one', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the benchmark."""
+    args = parse_args(argv)
+
+    if args.run_one is not None:
+        print(json.dumps(run_one(args.run_one, args.base_url, args.format)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    print("⏱️  End-to-end search_and_export benchmark")
+    print(f"   Stub latency {args.latency * 1000:.0f} ms (+{args.jitter * 1000:.0f} ms jitter), "
+          f"429 rate {args.rate_429:.1%}, format {args.format}")
+    print("=" * 92)
+    print(f"{'Businesses':>10}  {'Total (s)':>9}  {'Biz/s':>9}  {'Pages':>6}  {'p50 (ms)':>8}  "
+          f"{'p95 (ms)':>8}  {'429s':>5}  {'Export (s)':>10}  {'RSS (MB)':>8}")
+    print("-" * 92)
+
+    results = []
+    for size in sizes:
+        result = measure(size, args)
+        results.append(result)
+        print(f"{result['businesses']:>10,}  {result['seconds']:>9.3f}  {result['businesses_per_second']:>9,.0f}  "
+              f"{result['pages']:>6,}  {result['page_p50_ms']:>8.2f}  {result['page_p95_ms']:>8.2f}  "
+              f"{result['throttled']:>5,}  {result['export_seconds']:>10.3f}  {result['peak_rss_mb']:>8.1f}")
+    print("-" * 92)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📁 Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) over {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"✅ No regressions over {args.tolerance:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
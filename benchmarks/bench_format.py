@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: row-by-row vs columnar business formatting
+
+Compares ExcelGenerator.format_business_data (plus building the DataFrame
+from its rows) against ExcelGenerator.format_business_frame on synthetic
+Yelp search results. That both produce identical output is checked in
+tests/test_excel_generator.py.
+
+Usage:
+    python benchmarks/bench_format.py [row counts...]
+"""
+
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_generator import ExcelGenerator
+from config import EXCEL_COLUMNS
+
+DEFAULT_SIZES = [10_000, 100_000]
+REPEATS = 3
+
+CITIES = ['Nashville', 'Franklin', 'Brentwood', 'Hendersonville', 'Murfreesboro']
+CATEGORIES = [
+    {'alias': 'chiropractors', 'title': 'Chiropractors'},
+    {'alias': 'grocery', 'title': 'Grocery'},
+    {'alias': 'restaurants', 'title': 'Restaurants'},
+    {'alias': 'physicians', 'title': 'Doctors'},
+    {'alias': 'accountants', 'title': 'Accountants'}
+]
+
+def make_businesses(count: int, seed: int = 42) -> list:
+    """Build synthetic Yelp business dictionaries, including sparse records."""
+    rng = random.Random(seed)
+    businesses = []
+    for i in range(count):
+        business = {
+            'id': f'business-{i}',
+            'name': f'Business {i}',
+            'location': {
+                'address1': f'{rng.randint(1, 9999)} Main St' if rng.random() > 0.05 else None,
+                'city': rng.choice(CITIES),
+                'state': 'TN',
+                'zip_code': str(rng.randint(37000, 37250))
+            },
+            'categories': rng.sample(CATEGORIES, rng.randint(0, 3)),
+            'phone': f'+1615{rng.randint(1000000, 9999999)}' if rng.random() > 0.1 else '',
+            'url': f'https://www.yelp.com/biz/business-{i}',
+            'rating': rng.choice([2.5, 3.0, 3.5, 4.0, 4.5, 5.0]),
+            'review_count': rng.randint(0, 2000)
+        }
+        if rng.random() > 0.3:
+            business['price'] = '$' * rng.randint(1, 4)
+        businesses.append(business)
+    return businesses
+
+def best_of(func, repeats: int = REPEATS) -> float:
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    """Run the benchmark."""
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    generator = ExcelGenerator()
+
+    print("⏱️  Business formatting benchmark")
+    print("=" * 60)
+    print(f"{'Rows':>10}  {'Row loop (s)':>14}  {'Columnar (s)':>14}  {'Speedup':>8}")
+    print("-" * 60)
+
+    for size in sizes:
+        businesses = make_businesses(size)
+
+        def row_loop():
+            return pd.DataFrame(generator.format_business_data(businesses), columns=EXCEL_COLUMNS)
+
+        def columnar():
+            return generator.format_business_frame(businesses)
+
+        row_time = best_of(row_loop)
+        columnar_time = best_of(columnar)
+        print(f"{size:>10,}  {row_time:>14.3f}  {columnar_time:>14.3f}  {row_time / columnar_time:>7.2f}x")
+
+    print("-" * 60)
+
+if __name__ == "__main__":
+    main()
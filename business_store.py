@@ -0,0 +1,337 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+from excel_generator import ExcelGenerator
+from shared_instance import SharedInstance
+from config import (REFRESH_STORE_PATH, REFRESH_IGNORED_COLUMNS,
+                    REFRESH_CLOSE_AFTER_MISSES, SEARCH_MAX_WORKERS)
+
+# Kinds of change a refresh reports, in export order
+CHANGE_TYPES = ('new', 'changed', 'closed')
+
+# Lookup result for a business Yelp no longer knows, also assumed without a verify function
+_GONE = object()
+
+class RefreshDelta:
+    """What changed in one mailing list since its previous refresh."""
+
+    def __init__(self, list_key: str, first_run: bool = False):
+        self.list_key = list_key
+        self.first_run = first_run
+        self.new = []
+        self.changed = []
+        self.closed = []
+        self.unchanged = 0
+        self.missing = 0
+        # Writes BusinessStore.commit saves once the delta has been exported
+        self._upserts = []
+        self._missed_ids = []
+        self._open_ids = []
+        self._closed_ids = set()
+
+    @property
+    def total(self) -> int:
+        """Number of new, changed and closed businesses."""
+        return len(self.new) + len(self.changed) + len(self.closed)
+
+    def to_dict(self) -> Dict:
+        """Counts for each kind of change."""
+        return {
+            'new': len(self.new),
+            'changed': len(self.changed),
+            'closed': len(self.closed),
+            'unchanged': self.unchanged,
+            'missing': self.missing,
+            'first_run': self.first_run
+        }
+
+class BusinessStore:
+    """
+    Persistent SQLite snapshot of the businesses in each mailing list.
+
+    A list is identified by its search parameters. Each business is stored
+    under the list's key and its Yelp id, with a hash of its exported
+    columns, so a rerun can tell new, changed and unchanged businesses apart
+    without comparing whole records. Columns that drift week to week, such
+    as the rating, are left out of the hash.
+
+    A business missing from a rerun isn't necessarily closed: it may have
+    dropped below max_results. Missing businesses are looked up by id when
+    a verify function is given, and are reported closed when Yelp says so,
+    or once they have been missing for close_after_misses runs in a row.
+    With a verify function, only runs where Yelp no longer knows the id
+    count as misses; a lookup that failed, say on a rate limit, leaves the
+    count alone, and one that finds the business open resets it.
+    """
+
+    def __init__(self,
+                 path: str = REFRESH_STORE_PATH,
+                 ignored_columns: Iterable[str] = REFRESH_IGNORED_COLUMNS,
+                 close_after_misses: int = REFRESH_CLOSE_AFTER_MISSES,
+                 excel_generator: Optional[ExcelGenerator] = None):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite file location (':memory:' for a process-local store)
+            ignored_columns: Export columns left out of the content hash
+            close_after_misses: Consecutive missed runs after which a business counts as closed
+            excel_generator: Formats businesses into export columns for hashing
+        """
+        self.path = path
+        self.ignored_columns = set(ignored_columns)
+        self.close_after_misses = max(1, close_after_misses)
+        self.excel_generator = excel_generator or ExcelGenerator()
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS businesses (
+                    list_key TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    misses INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (list_key, id)
+                )
+            ''')
+
+    @staticmethod
+    def list_key(params: Dict) -> str:
+        """
+        Key identifying a mailing list by the search that builds it.
+
+        Args:
+            params: Search parameters as used by MailingListGenerator.iter_search
+
+        Returns:
+            Stable string key
+        """
+        return json.dumps({
+            'location': params['location'].strip().lower(),
+            'business_type': params.get('business_type') or None,
+            'include_subcategories': bool(params.get('include_subcategories')),
+            'radius': params['radius'],
+            'max_results': params['max_results']
+        }, sort_keys=True)
+
+    def content_hash(self, business: Dict) -> str:
+        """
+        Hash of the columns a business is exported with.
+
+        Args:
+            business: Business dictionary from the Yelp API
+
+        Returns:
+            Hex digest that changes when any hashed column does
+        """
+        row = next(self.excel_generator.iter_format_business_data([business]))
+        hashed = {column: value for column, value in row.items() if column not in self.ignored_columns}
+        return hashlib.sha1(json.dumps(hashed, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def snapshot(self, list_key: str) -> Dict[str, str]:
+        """
+        Content hashes of the businesses stored for a list.
+
+        Args:
+            list_key: Key from list_key
+
+        Returns:
+            Dictionary of Yelp id to content hash
+        """
+        with self._lock:
+            return dict(self._conn.execute(
+                'SELECT id, hash FROM businesses WHERE list_key = ?', (list_key,)))
+
+    def compare(self,
+                list_key: str,
+                businesses: Iterable[Dict],
+                verify: Optional[Callable[[str], Optional[Dict]]] = None,
+                max_workers: int = SEARCH_MAX_WORKERS) -> RefreshDelta:
+        """
+        Compare fresh search results with the stored list.
+
+        Nothing is saved until the delta is passed to commit, so a run that
+        fails to export it reports the same changes next time.
+
+        Args:
+            list_key: Key from list_key
+            businesses: Fresh results for the list, streamed or in a list
+            verify: Looks up a missing business by id, returning its details,
+                None if the lookup failed, or raising LookupError if the
+                business no longer exists, e.g. YelpAPIClient.get_business_details
+                with raise_not_found=True (optional)
+            max_workers: Missing businesses verified at once
+
+        Returns:
+            The new, changed and closed businesses
+        """
+        previous = self.snapshot(list_key)
+        delta = RefreshDelta(list_key, first_run=not previous)
+        now = time.time()
+
+        seen = set()
+        for business in businesses:
+            business_id = business.get('id')
+            if not business_id or business_id in seen:
+                continue
+            if business.get('is_closed'):
+                # Closed businesses reported by the search itself
+                if business_id in previous:
+                    delta.closed.append(business)
+                continue
+
+            content_hash = self.content_hash(business)
+            seen.add(business_id)
+            delta._upserts.append((list_key, business_id, content_hash, json.dumps(business), now, now))
+            if business_id not in previous:
+                delta.new.append(business)
+            elif previous[business_id] != content_hash:
+                delta.changed.append(business)
+            else:
+                delta.unchanged += 1
+
+        reported_closed = {business['id'] for business in delta.closed}
+        missing = [business_id for business_id in previous
+                   if business_id not in seen and business_id not in reported_closed]
+        closed_ids, delta._missed_ids, delta._open_ids = self._check_missing(
+            list_key, missing, verify, max_workers, delta)
+        delta._closed_ids = closed_ids | reported_closed
+        delta.missing = len(missing) - len(closed_ids)
+        return delta
+
+    def commit(self, delta: RefreshDelta) -> None:
+        """
+        Save a delta from compare as the list's new snapshot.
+
+        Args:
+            delta: Delta returned by compare, once it has been exported
+        """
+        list_key = delta.list_key
+        with self._lock, self._conn:
+            self._conn.executemany('''
+                INSERT INTO businesses (list_key, id, hash, data, first_seen, last_seen, misses)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT (list_key, id) DO UPDATE SET
+                    hash = excluded.hash, data = excluded.data,
+                    last_seen = excluded.last_seen, misses = 0
+            ''', delta._upserts)
+            self._conn.executemany(
+                'UPDATE businesses SET misses = misses + 1 WHERE list_key = ? AND id = ?',
+                [(list_key, business_id) for business_id in delta._missed_ids])
+            self._conn.executemany(
+                'UPDATE businesses SET misses = 0 WHERE list_key = ? AND id = ?',
+                [(list_key, business_id) for business_id in delta._open_ids])
+            self._conn.executemany(
+                'DELETE FROM businesses WHERE list_key = ? AND id = ?',
+                [(list_key, business_id) for business_id in delta._closed_ids])
+
+    def refresh(self,
+                list_key: str,
+                businesses: Iterable[Dict],
+                verify: Optional[Callable[[str], Optional[Dict]]] = None,
+                max_workers: int = SEARCH_MAX_WORKERS) -> RefreshDelta:
+        """
+        Compare fresh search results with the stored list and save them at once.
+
+        Takes the same arguments as compare. Use compare and commit instead
+        when the delta is exported, so a failed export isn't lost.
+
+        Returns:
+            The new, changed and closed businesses
+        """
+        delta = self.compare(list_key, businesses, verify, max_workers)
+        self.commit(delta)
+        return delta
+
+    def _check_missing(self,
+                       list_key: str,
+                       missing: List[str],
+                       verify: Optional[Callable[[str], Optional[Dict]]],
+                       max_workers: int,
+                       delta: RefreshDelta):
+        """
+        Decide which missing businesses have closed, adding them to the delta.
+
+        Returns:
+            Tuple of (ids to delete, ids whose miss count goes up,
+            ids confirmed open whose miss count is reset)
+        """
+        if not missing:
+            return set(), [], []
+
+        wanted = set(missing)
+        with self._lock:
+            stored = {}
+            for business_id, data, misses in self._conn.execute(
+                    'SELECT id, data, misses FROM businesses WHERE list_key = ?', (list_key,)):
+                if business_id in wanted:
+                    stored[business_id] = (json.loads(data), misses)
+
+        details = {}
+        if verify is not None:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                details = dict(zip(missing, executor.map(self._lookup(verify), missing)))
+
+        closed_ids = set()
+        missed_ids = []
+        open_ids = []
+        for business_id in missing:
+            data, misses = stored[business_id]
+            found = details.get(business_id, _GONE)
+            if found is None:
+                # The lookup failed, which says nothing about the business
+                continue
+            if found is not _GONE and found.get('is_closed'):
+                delta.closed.append(dict(data, is_closed=True))
+                closed_ids.add(business_id)
+            elif found is not _GONE:
+                # Yelp still lists it as open, so any earlier misses were false alarms
+                open_ids.append(business_id)
+            elif misses + 1 >= self.close_after_misses:
+                delta.closed.append(data)
+                closed_ids.add(business_id)
+            else:
+                # Gone, but not for long enough to be sure
+                missed_ids.append(business_id)
+        return closed_ids, missed_ids, open_ids
+
+    @staticmethod
+    def _lookup(verify: Callable[[str], Optional[Dict]]) -> Callable[[str], Optional[Dict]]:
+        """Wrap verify so a business that no longer exists comes back as _GONE."""
+        def lookup(business_id: str) -> Optional[Dict]:
+            try:
+                return verify(business_id)
+            except LookupError:
+                return _GONE
+        return lookup
+
+    def forget(self, list_key: str) -> None:
+        """Remove everything stored for a list, so its next refresh starts over."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM businesses WHERE list_key = ?', (list_key,))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+# Process-wide store shared by every incremental run
+_shared_store = SharedInstance(BusinessStore)
+
+def get_business_store() -> BusinessStore:
+    """Return the process-wide business store."""
+    return _shared_store.get()
@@ -0,0 +1,224 @@
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from yelp_api_client import YelpAPIClient
+from progress import ProgressCallback
+from config import CATEGORY_BATCH_MAX_ALIASES, CATEGORY_BATCH_MAX_CHARS, MAX_RESULTS
+
+class CategoryHierarchy:
+    """
+    Parent/child index over Yelp categories.
+
+    Built once from the categories' parent_aliases. Ancestors and
+    descendants of every alias are precomputed, so lookups are a single
+    dictionary access.
+    """
+
+    def __init__(self, categories: List[Dict]):
+        """
+        Build the index.
+
+        Args:
+            categories: Category dictionaries with 'alias' and 'parent_aliases'
+        """
+        # Dicts as ordered sets; an alias can be listed more than once
+        parents = defaultdict(dict)
+        children = defaultdict(dict)
+        for cat in categories:
+            parents[cat['alias']]
+            for parent in cat.get('parent_aliases') or ():
+                parents[cat['alias']][parent] = None
+                children[parent][cat['alias']] = None
+
+        self._parents = {alias: tuple(found) for alias, found in parents.items()}
+        self._children = {alias: tuple(found) for alias, found in children.items()}
+
+        self._descendants = {}
+        self._ancestors = {}
+        for alias in self._parents:
+            self._descendants[alias] = self._walk(alias, self._children)
+            self._ancestors[alias] = self._walk(alias, self._parents)
+
+        self._descendant_sets = {alias: frozenset(found) for alias, found in self._descendants.items()}
+
+    @staticmethod
+    def _walk(alias: str, edges: Dict) -> Tuple[str, ...]:
+        """Aliases reachable from an alias, depth first, excluding itself."""
+        found = []
+        seen = {alias}
+        stack = list(reversed(edges.get(alias, ())))
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            found.append(current)
+            stack.extend(reversed(edges.get(current, ())))
+        return tuple(found)
+
+    def __contains__(self, alias: str) -> bool:
+        return alias in self._parents
+
+    def parents(self, alias: str) -> Tuple[str, ...]:
+        """Direct parents of an alias."""
+        return self._parents.get(alias, ())
+
+    def children(self, alias: str) -> Tuple[str, ...]:
+        """Direct children of an alias."""
+        return self._children.get(alias, ())
+
+    def ancestors(self, alias: str) -> Tuple[str, ...]:
+        """All ancestors of an alias, nearest first."""
+        return self._ancestors.get(alias, ())
+
+    def descendants(self, alias: str) -> Tuple[str, ...]:
+        """All descendants of an alias, in depth-first order."""
+        return self._descendants.get(alias, ())
+
+    def is_descendant(self, alias: str, ancestor: str) -> bool:
+        """Whether alias sits anywhere below ancestor."""
+        return alias in self._descendant_sets.get(ancestor, ())
+
+    def expand(self, alias: str) -> List[str]:
+        """An alias followed by all of its descendants."""
+        return [alias, *self.descendants(alias)]
+
+    def batches(self,
+                alias: str,
+                max_aliases: int = CATEGORY_BATCH_MAX_ALIASES,
+                max_chars: int = CATEGORY_BATCH_MAX_CHARS) -> List[str]:
+        """
+        Comma-joined category parameters covering an alias and its descendants.
+
+        Args:
+            alias: Category alias to expand
+            max_aliases: Maximum aliases in one parameter
+            max_chars: Maximum length of one parameter
+
+        Returns:
+            List of values for the search 'categories' parameter
+        """
+        return pack_aliases(self.expand(alias), max_aliases, max_chars)
+
+def pack_aliases(aliases: List[str],
+                 max_aliases: int = CATEGORY_BATCH_MAX_ALIASES,
+                 max_chars: int = CATEGORY_BATCH_MAX_CHARS) -> List[str]:
+    """
+    Pack aliases into as few comma-joined strings as the limits allow.
+
+    Aliases keep their order, so siblings from a depth-first walk land in
+    the same batch.
+
+    Args:
+        aliases: Category aliases
+        max_aliases: Maximum aliases per string
+        max_chars: Maximum length per string
+
+    Returns:
+        List of comma-joined alias strings
+    """
+    batches = []
+    batch = []
+    length = 0
+    for alias in aliases:
+        added = len(alias) + (1 if batch else 0)
+        if batch and (len(batch) >= max_aliases or length + added > max_chars):
+            batches.append(','.join(batch))
+            batch = []
+            added = len(alias)
+            length = 0
+        batch.append(alias)
+        length += added
+    if batch:
+        batches.append(','.join(batch))
+    return batches
+
+class CategorySearch:
+    """
+    Search a parent category by fanning out over its descendants.
+
+    The parent and every descendant alias are packed into a few
+    comma-joined 'categories' parameters. Each batch is searched in turn
+    and results are deduplicated by business id, so broad categories no
+    longer depend on how Yelp expands a parent server-side, and each batch
+    gets its own result ceiling.
+    """
+
+    def __init__(self,
+                 client: YelpAPIClient,
+                 hierarchy: Optional[CategoryHierarchy] = None,
+                 max_aliases: int = CATEGORY_BATCH_MAX_ALIASES,
+                 max_chars: int = CATEGORY_BATCH_MAX_CHARS):
+        """
+        Initialize the category search.
+
+        Args:
+            client: Yelp API client used for all requests
+            hierarchy: Category index (defaults to the shared registry's)
+            max_aliases: Maximum aliases per request
+            max_chars: Maximum length of the categories parameter
+        """
+        if hierarchy is None:
+            from category_registry import get_category_registry
+            hierarchy = get_category_registry().hierarchy
+
+        self.client = client
+        self.hierarchy = hierarchy
+        self.max_aliases = max_aliases
+        self.max_chars = max_chars
+
+    def iter_businesses(self,
+                        location: str,
+                        category: str,
+                        radius: int = 40000,
+                        max_results: Optional[int] = None,
+                        concurrent: bool = False,
+                        progress: Optional[ProgressCallback] = None) -> Iterator[Dict]:
+        """
+        Yield unique businesses from a category and all of its descendants.
+
+        Args:
+            location: City, state, or ZIP code
+            category: Category alias to expand
+            radius: Search radius in meters
+            max_results: Optional cap on yielded businesses
+            concurrent: Fetch each batch's pages in parallel
+            progress: Callback told about each page and rate-limit wait (optional)
+
+        Yields:
+            Business dictionaries from Yelp API
+        """
+        seen = set()
+        for batch in self.hierarchy.batches(category, self.max_aliases, self.max_chars):
+            remaining = max_results - len(seen) if max_results else MAX_RESULTS
+            for business in self.client.iter_businesses(location=location,
+                                                        business_type=batch,
+                                                        radius=radius,
+                                                        max_results=remaining,
+                                                        concurrent=concurrent,
+                                                        progress=progress):
+                business_id = business.get('id')
+                if business_id in seen:
+                    continue
+                seen.add(business_id)
+                yield business
+                if max_results and len(seen) >= max_results:
+                    return
+
+    def search(self,
+               location: str,
+               category: str,
+               radius: int = 40000,
+               max_results: Optional[int] = None) -> List[Dict]:
+        """
+        Collect unique businesses from a category and all of its descendants.
+
+        Args:
+            location: City, state, or ZIP code
+            category: Category alias to expand
+            radius: Search radius in meters
+            max_results: Optional cap on returned businesses
+
+        Returns:
+            List of business dictionaries
+        """
+        return list(self.iter_businesses(location, category, radius, max_results))
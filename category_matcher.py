@@ -0,0 +1,196 @@
+import heapq
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher, get_close_matches
+from typing import Dict, List, Optional, Tuple
+
+class CategoryMatcher:
+    """
+    Fuzzy matcher over Yelp category aliases and titles.
+
+    All indexes are built once up front: a padded n-gram index narrows
+    fuzzy lookups to keys that share text with the query, and a sorted
+    token list answers prefix lookups for type-ahead. Fuzzy scores come
+    from difflib's SequenceMatcher, so results agree with
+    difflib.get_close_matches over the same keys.
+
+    Bigrams rather than trigrams are indexed because they make the
+    narrowing exact: a key sharing no padded bigram with the query can only
+    match in isolated single characters, separated from each other and
+    from both ends by unmatched ones, which caps its ratio below 2/3.
+    """
+
+    GRAM_SIZE = 2
+    # Highest ratio a key sharing no indexed n-gram with the query can reach
+    INDEX_EXACT_ABOVE = 2 / 3
+
+    def __init__(self, categories: List[Dict]):
+        """
+        Build the indexes.
+
+        Args:
+            categories: Category dictionaries with 'alias' and 'title'
+        """
+        self.categories = categories
+        self.aliases = {cat['alias']: cat for cat in categories}
+        self.titles = {cat['title'].lower(): cat for cat in categories}
+
+        # Same key order difflib would see, duplicates included
+        self.keys = list(self.aliases.keys()) + list(self.titles.keys())
+
+        self._grams = defaultdict(set)
+        for index, key in enumerate(self.keys):
+            for gram in self._ngrams(key):
+                self._grams[gram].add(index)
+
+        # (token, key) pairs for every word in every key, sorted for bisect
+        self._prefixes = sorted({
+            (token, key)
+            for key in self.keys
+            for token in [key] + key.replace('-', ' ').split()
+        })
+
+    @classmethod
+    def _ngrams(cls, text: str) -> set:
+        """Bigrams of the text with a boundary marker at each end."""
+        padded = f"\x00{text}\x00"
+        return {padded[i:i + cls.GRAM_SIZE] for i in range(len(padded) - cls.GRAM_SIZE + 1)}
+
+    def resolve(self, key: str) -> Optional[str]:
+        """Map an alias or lower-cased title to its category alias."""
+        if key in self.aliases:
+            return key
+        if key in self.titles:
+            return self.titles[key]['alias']
+        return None
+
+    def match(self, user_input: str, cutoff: float = 0.7) -> Optional[str]:
+        """
+        Match user input to the closest Yelp category alias.
+
+        Args:
+            user_input: Category alias or title typed by the user
+            cutoff: Minimum similarity for a fuzzy match
+
+        Returns:
+            Category alias or None if nothing is close enough
+        """
+        user_input = user_input.strip().lower()
+        if not user_input:
+            return None
+
+        # Direct alias or title match
+        direct = self.resolve(user_input)
+        if direct:
+            return direct
+
+        matches = self.close_matches(user_input, n=1, cutoff=cutoff)
+        return self.resolve(matches[0]) if matches else None
+
+    def close_matches(self, query: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        """
+        Drop-in equivalent of difflib.get_close_matches over the category keys.
+
+        Only keys sharing an n-gram with the query are scored, which gives
+        the same answer as a full scan whenever the cutoff is above 2/3
+        (including the 0.7 used by match). Lower cutoffs fall back to
+        difflib's full scan.
+
+        Args:
+            query: Lower-cased text to match
+            n: Maximum number of matches
+            cutoff: Minimum similarity score in [0, 1]
+
+        Returns:
+            Best matching keys, best first
+        """
+        if cutoff <= self.INDEX_EXACT_ABOVE:
+            return get_close_matches(query, self.keys, n=n, cutoff=cutoff)
+
+        return [key for _, key in self._top(query, n, cutoff)]
+
+    def suggest(self, query: str, k: int = 10, cutoff: float = 0.6) -> List[Dict]:
+        """
+        Rank categories for type-ahead.
+
+        Prefix matches on any word of an alias or title come first (shortest
+        key first), followed by fuzzy matches by score.
+
+        Args:
+            query: Partial text typed by the user
+            k: Maximum number of categories
+            cutoff: Minimum similarity for fuzzy matches
+
+        Returns:
+            Category dictionaries, best first
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        ranked = []
+        seen = set()
+
+        def add(key: str) -> None:
+            alias = self.resolve(key)
+            if alias and alias not in seen:
+                seen.add(alias)
+                ranked.append(self.aliases[alias])
+
+        prefixed = []
+        start = bisect_left(self._prefixes, (query, ''))
+        for token, key in self._prefixes[start:]:
+            if not token.startswith(query):
+                break
+            prefixed.append(key)
+        for key in sorted(set(prefixed), key=lambda key: (len(key), key)):
+            add(key)
+            if len(ranked) >= k:
+                return ranked
+
+        for _, key in self._top(query, k, cutoff):
+            add(key)
+            if len(ranked) >= k:
+                break
+
+        return ranked
+
+    def _candidates(self, query: str) -> List[int]:
+        """
+        Indexes of keys that share at least one n-gram with the query.
+
+        Keys sharing the most n-grams come first, as they are the likeliest
+        to score well.
+        """
+        shared = Counter()
+        for gram in self._ngrams(query):
+            shared.update(self._grams.get(gram, ()))
+        return [index for index, _ in shared.most_common()]
+
+    def _top(self, query: str, n: int, cutoff: float) -> List[Tuple[float, str]]:
+        """
+        Best n (score, key) pairs among the candidates, ranked as difflib does.
+
+        Once n matches are held, keys whose cheap upper bounds fall below
+        the weakest of them are skipped without computing a full ratio.
+        """
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        best = []  # min-heap of the n best (score, key) pairs so far
+
+        for index in self._candidates(query):
+            threshold = best[0][0] if len(best) >= n else cutoff
+            key = self.keys[index]
+            matcher.set_seq1(key)
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
+
+            score = matcher.ratio()
+            if score < cutoff:
+                continue
+            if len(best) < n:
+                heapq.heappush(best, (score, key))
+            else:
+                heapq.heappushpop(best, (score, key))
+
+        return sorted(best, reverse=True)
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+from category_matcher import CategoryMatcher
+from category_hierarchy import CategoryHierarchy
+from shared_instance import SharedInstance
+from config import CATEGORIES_FILE
+
+class CategorySnapshot:
+    """
+    One parsed version of the categories file.
+
+    Snapshots are never modified after they are built, so callers can hold
+    on to one while the registry swaps in a newer version.
+    """
+
+    def __init__(self, categories: List[Dict], mtime_ns: Optional[int] = None):
+        """
+        Build the lookup tables and serialized payload.
+
+        Args:
+            categories: Category dictionaries with 'alias' and 'title'
+            mtime_ns: Modification time of the file they were read from
+        """
+        self.categories = categories
+        self.mtime_ns = mtime_ns
+        self.matcher = CategoryMatcher(categories)
+        self.aliases = self.matcher.aliases
+        self.titles = self.matcher.titles
+        self.hierarchy = CategoryHierarchy(categories)
+
+        # Served as-is by GET /categories
+        self.payload = json.dumps(categories, separators=(',', ':')).encode('utf-8')
+        self.etag = hashlib.sha1(self.payload).hexdigest()
+
+class CategoryRegistry:
+    """
+    Lazily loaded, memoized view of the Yelp categories file.
+
+    The file is parsed on first use and again only when its modification
+    time changes, so the CLI and web app share one parse per process.
+    """
+
+    def __init__(self, path: str = CATEGORIES_FILE):
+        """
+        Initialize the registry without reading the file.
+
+        Args:
+            path: Path to the categories JSON file
+        """
+        self.path = path
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> CategorySnapshot:
+        """Return the current snapshot, reloading it if the file changed."""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.mtime_ns == mtime_ns:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot.mtime_ns != mtime_ns:
+                self._snapshot = CategorySnapshot(self._read(), mtime_ns)
+            return self._snapshot
+
+    def _read(self) -> List[Dict]:
+        """Parse the categories file, or return an empty list on error."""
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"❌ Error loading categories: {e}")
+            return []
+
+    @property
+    def categories(self) -> List[Dict]:
+        """All category dictionaries."""
+        return self.snapshot().categories
+
+    @property
+    def matcher(self) -> CategoryMatcher:
+        """Fuzzy matcher over the current categories."""
+        return self.snapshot().matcher
+
+    @property
+    def hierarchy(self) -> CategoryHierarchy:
+        """Parent/child index over the current categories."""
+        return self.snapshot().hierarchy
+
+    def match(self, user_input: str) -> Optional[str]:
+        """Match user input to the closest Yelp category alias."""
+        return self.matcher.match(user_input)
+
+    def suggest(self, query: str, k: int = 10) -> List[Dict]:
+        """Rank categories for type-ahead."""
+        return self.matcher.suggest(query, k=k)
+
+# Process-wide registry shared by the CLI and web app
+_shared_category_registry = SharedInstance(CategoryRegistry)
+
+def get_category_registry() -> CategoryRegistry:
+    """Return the process-wide category registry, creating it on first use."""
+    return _shared_category_registry.get()
@@ -6,11 +6,75 @@ load_dotenv()
 
 # Yelp API Configuration
 YELP_API_KEY = os.getenv('YELP_API_KEY')
-YELP_BASE_URL = 'https://api.yelp.com/v3'
+YELP_BASE_URL = os.getenv('YELP_BASE_URL', 'https://api.yelp.com/v3')  # Point at yelp_stub_server.py for offline runs
 
 # Default search parameters
 DEFAULT_LIMIT = 50  # Maximum results per request
 MAX_RESULTS = 1000  # Maximum total results to collect
+SEARCH_MAX_WORKERS = int(os.getenv('SEARCH_MAX_WORKERS', 4))  # Pages fetched in parallel in concurrent mode
+TILE_MIN_RADIUS = 500  # Smallest tile radius in meters for tiled searches
+
+# Rate limiting - Yelp allows 5000 requests per day
+YELP_REQUESTS_PER_SECOND = float(os.getenv('YELP_REQUESTS_PER_SECOND', 10))
+YELP_DAILY_BUDGET = int(os.getenv('YELP_DAILY_BUDGET', 5000))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', 5))  # Retries per request after HTTP 429
+RATE_LIMIT_BASE_BACKOFF = 1.0  # Seconds; doubled on each retry, with jitter
+RATE_LIMIT_MAX_BACKOFF = 60.0  # Longest single backoff in seconds
+
+# Response cache settings
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() != 'false'
+RESPONSE_CACHE_PATH = os.getenv('RESPONSE_CACHE_PATH', os.path.join('cache', 'yelp_responses.sqlite'))
+RESPONSE_CACHE_TTLS = {
+    'search': 24 * 3600,      # Search pages go stale quickly
+    'details': 7 * 24 * 3600  # Business details change rarely
+}
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 20000))
+
+# HTTP connection pool settings
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))  # Number of host pools to cache
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 16))  # Max connections kept alive per host
+HTTP_KEEP_ALIVE = os.getenv('HTTP_KEEP_ALIVE', 'true').lower() != 'false'
+HTTP_COMPRESSION = os.getenv('HTTP_COMPRESSION', 'true').lower() != 'false'
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))  # Seconds to establish a connection
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))  # Seconds to wait for response data
+ASYNC_MAX_CONCURRENCY = int(os.getenv('ASYNC_MAX_CONCURRENCY', 8))  # Requests in flight per AsyncYelpAPIClient
+
+# Background jobs for the web interface
+JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', 2))  # Mailing lists generated at once
+JOB_WORKER_MODE = os.getenv('JOB_WORKER_MODE', 'thread')  # 'thread' or 'process'
+JOB_DB_PATH = os.getenv('JOB_DB_PATH', '')  # SQLite file shared by worker processes; empty keeps jobs in memory
+JOB_PRUNE_INTERVAL = 60  # Seconds between sweeps for expired job records
+
+# Incremental refresh: businesses last exported for each list, to export only what changed
+REFRESH_STORE_PATH = os.getenv('REFRESH_STORE_PATH', os.path.join('cache', 'business_store.sqlite'))
+REFRESH_IGNORED_COLUMNS = ['Rating', 'Review Count']  # Columns that change too often to count as a change
+REFRESH_CLOSE_AFTER_MISSES = int(os.getenv('REFRESH_CLOSE_AFTER_MISSES', 2))  # Missed runs before an unverified business counts as closed
+
+# Deduplication across overlapping searches
+DEDUP_NAME_THRESHOLD = 0.85  # Name similarity for businesses sharing a phone number or address
+DEDUP_MAX_BLOCK_SIZE = 100  # Businesses compared per shared phone number or address
+
+# Batch runs from a jobs file (batch.py)
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))  # Jobs searched at once
+
+# Generated files waiting to be downloaded
+ARTIFACT_STORE_DIR = os.getenv('ARTIFACT_STORE_DIR', '')  # Directory shared by worker processes; empty keeps files in memory
+ARTIFACT_TTL_SECONDS = int(os.getenv('ARTIFACT_TTL_SECONDS', 3600))  # How long a file stays downloadable
+ARTIFACT_MAX_BYTES = int(os.getenv('ARTIFACT_MAX_BYTES', 512 * 1024 * 1024))  # Total size before LRU eviction
+ARTIFACT_MAX_ITEM_BYTES = int(os.getenv('ARTIFACT_MAX_ITEM_BYTES', 128 * 1024 * 1024))  # Largest single file
+ARTIFACT_REAP_INTERVAL = 60  # Seconds between sweeps for expired files
+
+# Progress events for long generations
+PROGRESS_MAX_EVENTS = 1000  # Events kept per job for streaming readers
+PROGRESS_ROW_INTERVAL = 250  # Rows written between export progress events
+SSE_KEEPALIVE_SECONDS = 15  # Idle time before an event stream sends a keep-alive comment
+
+# Full Yelp category list, as written by yelp_categories_fetcher.py
+CATEGORIES_FILE = os.getenv('CATEGORIES_FILE', 'yelp_categories.json')
+
+# Parent categories are searched as batches of comma-joined child aliases
+CATEGORY_BATCH_MAX_ALIASES = int(os.getenv('CATEGORY_BATCH_MAX_ALIASES', 20))  # Aliases per request
+CATEGORY_BATCH_MAX_CHARS = int(os.getenv('CATEGORY_BATCH_MAX_CHARS', 500))  # Length of the categories parameter
 
 # Business categories for filtering
 BUSINESS_CATEGORIES = {
@@ -48,4 +112,17 @@ EXCEL_COLUMNS = [
     'Review Count',
     'Price Level',
     'Yelp URL'
-] 
\ No newline at end of file
+]
+
+# Optional columns filled from business details when a list is enriched
+ENRICHED_COLUMNS = ['Hours', 'Photos', 'Claimed']
+ENRICH_MAX_WORKERS = int(os.getenv('ENRICH_MAX_WORKERS', 8))  # Business details fetched at once
+
+# Bytes an in-memory export may use before spilling to a temporary file
+EXPORT_SPOOL_MAX_BYTES = int(os.getenv('EXPORT_SPOOL_MAX_BYTES', 32 * 1024 * 1024))
+
+# Rows sampled to size columns in streaming exports
+EXCEL_WIDTH_SAMPLE_ROWS = 1000
+
+# Rows per batch for columnar exports (Parquet row groups)
+EXPORT_BATCH_ROWS = 5000
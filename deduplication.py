@@ -0,0 +1,205 @@
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from config import DEDUP_NAME_THRESHOLD, DEDUP_MAX_BLOCK_SIZE
+
+# Spellings folded together when comparing street addresses
+ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'av': 'ave', 'road': 'rd', 'boulevard': 'blvd',
+    'drive': 'dr', 'lane': 'ln', 'court': 'ct', 'place': 'pl', 'parkway': 'pkwy',
+    'highway': 'hwy', 'circle': 'cir', 'square': 'sq', 'terrace': 'ter', 'pike': 'pk',
+    'suite': 'ste', 'unit': 'ste', 'apt': 'ste', 'building': 'bldg',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w'
+}
+
+# Words that don't tell two business names apart
+NAME_STOPWORDS = {'the', 'and', 'of', 'llc', 'inc', 'co', 'corp', 'ltd', 'pllc', 'pc'}
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Digits of a phone number without the US country code, or None if too short."""
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits if len(digits) >= 7 else None
+
+def normalize_address(location: Optional[Dict]) -> Optional[str]:
+    """
+    Street address and 5-digit ZIP of a Yelp location, in one comparable form.
+
+    Args:
+        location: Yelp 'location' dictionary
+
+    Returns:
+        Normalized address key, or None without a street address
+    """
+    location = location or {}
+    street = ' '.join(filter(None, (location.get(field) for field in ('address1', 'address2', 'address3'))))
+    tokens = re.sub(r'[^a-z0-9]+', ' ', street.lower().replace('#', ' ste ')).split()
+    if not tokens:
+        return None
+    zip_code = re.sub(r'\D', '', location.get('zip_code') or '')[:5]
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens) + f"|{zip_code}"
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lower-cased business name without punctuation or filler words."""
+    tokens = re.sub(r'[^a-z0-9]+', ' ', (name or '').lower().replace('&', ' and ')).split()
+    return ' '.join(token for token in tokens if token not in NAME_STOPWORDS)
+
+class BusinessDeduplicator:
+    """
+    Streaming duplicate filter for businesses from overlapping searches.
+
+    Exact duplicates are dropped with a hash index on the Yelp id, so each
+    business costs one lookup. Near-duplicates, such as a second listing of
+    the same business under another id, are found by blocking: each kept
+    business is filed under its normalized phone number and its normalized
+    street address, and a new business is only compared with the kept
+    businesses sharing one of those blocks instead of with every one.
+
+    Two businesses are near-duplicates when they share a phone number and
+    an address, or when they share either one and their names are similar.
+    The first business seen is kept.
+    """
+
+    def __init__(self,
+                 near_duplicates: bool = True,
+                 name_threshold: float = DEDUP_NAME_THRESHOLD,
+                 max_block_size: int = DEDUP_MAX_BLOCK_SIZE):
+        """
+        Initialize an empty index.
+
+        Args:
+            near_duplicates: Also drop near-duplicates with different ids
+            name_threshold: Minimum name similarity in [0, 1] for a near-duplicate
+            max_block_size: Kept businesses compared per block, bounding the
+                cost of busy shared numbers and addresses
+        """
+        self.near_duplicates = near_duplicates
+        self.name_threshold = name_threshold
+        self.max_block_size = max_block_size
+
+        self._ids = {}
+        self._records = []  # (name, phone, address) of each kept business
+        self._blocks = defaultdict(list)
+        self.kept = 0
+        self.duplicate_ids = 0
+        self.near_duplicate_count = 0
+
+    def add(self, business: Dict) -> bool:
+        """
+        Index a business unless it duplicates one already kept.
+
+        Args:
+            business: Business dictionary from the Yelp API
+
+        Returns:
+            True if the business is new and was kept
+        """
+        business_id = business.get('id')
+        if business_id is not None and business_id in self._ids:
+            self.duplicate_ids += 1
+            return False
+
+        if self.near_duplicates:
+            record = (normalize_name(business.get('name')),
+                      normalize_phone(business.get('phone')),
+                      normalize_address(business.get('location')))
+            match = self._find_near_duplicate(record)
+            if match is not None:
+                # Later copies of this listing are dropped by id
+                if business_id is not None:
+                    self._ids[business_id] = match
+                self.near_duplicate_count += 1
+                return False
+
+            index = len(self._records)
+            self._records.append(record)
+            for key in self._block_keys(record):
+                block = self._blocks[key]
+                if len(block) < self.max_block_size:
+                    block.append(index)
+        else:
+            index = self.kept
+
+        if business_id is not None:
+            self._ids[business_id] = index
+        self.kept += 1
+        return True
+
+    @staticmethod
+    def _block_keys(record: Tuple[str, Optional[str], Optional[str]]) -> List[Tuple[str, str]]:
+        """Blocks a business is filed under: its phone number and its address."""
+        _, phone, address = record
+        keys = []
+        if phone:
+            keys.append(('phone', phone))
+        if address:
+            keys.append(('address', address))
+        return keys
+
+    def _find_near_duplicate(self, record: Tuple[str, Optional[str], Optional[str]]) -> Optional[int]:
+        """Index of a kept business that record near-duplicates, if any."""
+        name, phone, address = record
+        matcher = None
+        seen = set()
+        for key in self._block_keys(record):
+            for index in self._blocks.get(key, ()):
+                if index in seen:
+                    continue
+                seen.add(index)
+
+                other_name, other_phone, other_address = self._records[index]
+                same_phone = phone is not None and phone == other_phone
+                same_address = address is not None and address == other_address
+                if same_phone and same_address:
+                    return index
+
+                if not name or not other_name:
+                    continue
+                if name == other_name:
+                    return index
+                if matcher is None:
+                    matcher = SequenceMatcher()
+                    matcher.set_seq2(name)
+                matcher.set_seq1(other_name)
+                if (matcher.real_quick_ratio() >= self.name_threshold
+                        and matcher.quick_ratio() >= self.name_threshold
+                        and matcher.ratio() >= self.name_threshold):
+                    return index
+        return None
+
+    def iter_unique(self, businesses: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Pass through the businesses that aren't duplicates.
+
+        Args:
+            businesses: Businesses, streamed or in a list
+
+        Yields:
+            The first copy of each unique business
+        """
+        for business in businesses:
+            if self.add(business):
+                yield business
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of kept and dropped businesses."""
+        return {
+            'kept': self.kept,
+            'duplicate_ids': self.duplicate_ids,
+            'near_duplicates': self.near_duplicate_count
+        }
+
+def deduplicate(businesses: Iterable[Dict], near_duplicates: bool = True) -> List[Dict]:
+    """
+    Drop duplicate businesses, keeping the first copy of each.
+
+    Args:
+        businesses: Businesses from one or more searches
+        near_duplicates: Also drop near-duplicates with different ids
+
+    Returns:
+        Unique businesses in their original order
+    """
+    return list(BusinessDeduplicator(near_duplicates).iter_unique(businesses))
@@ -0,0 +1,112 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+from yelp_api_client import YelpAPIClient
+from progress import ProgressCallback
+from config import ENRICH_MAX_WORKERS
+
+# Business detail fields missing from search results
+DETAIL_FIELDS = ('hours', 'special_hours', 'photos', 'is_claimed')
+
+class BusinessEnricher:
+    """
+    Adds business details to search results, fetching them concurrently.
+
+    Each business costs one details request, made through the client so it
+    goes through the shared rate limiter and is answered from the response
+    cache when it was fetched recently. Businesses that already carry their
+    details are passed through without a request.
+    """
+
+    def __init__(self, client: YelpAPIClient, max_workers: int = ENRICH_MAX_WORKERS):
+        """
+        Initialize the enricher.
+
+        Args:
+            client: Yelp API client used for all requests
+            max_workers: Maximum details requests in flight
+        """
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.fetched = 0
+        self.failed = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def enrich_one(self, business: Dict, progress: Optional[ProgressCallback] = None) -> Dict:
+        """
+        Merge one business's details into a copy of it.
+
+        Args:
+            business: Business dictionary from a search
+            progress: Callback told about rate-limit waits (optional)
+
+        Returns:
+            The business with DETAIL_FIELDS added, or unchanged if the
+            details couldn't be fetched
+        """
+        if 'photos' in business or not business.get('id'):
+            # Already enriched, or nothing to look up
+            self._count('skipped')
+            return business
+
+        details = self.client.get_business_details(business['id'], progress=progress)
+        if details is None:
+            self._count('failed')
+            return business
+
+        self._count('fetched')
+        return dict(business, **{field: details[field] for field in DETAIL_FIELDS if field in details})
+
+    def _count(self, outcome: str) -> None:
+        """Add one to an outcome counter from any worker thread."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def iter_enrich(self,
+                    businesses: Iterable[Dict],
+                    progress: Optional[ProgressCallback] = None) -> Iterator[Dict]:
+        """
+        Enrich a stream of businesses, keeping their order.
+
+        At most max_workers requests run at once and only twice that many
+        businesses are held waiting, so the input can be a live search
+        stream of any length.
+
+        Args:
+            businesses: Businesses, streamed or in a list
+            progress: Callback told about rate-limit waits (optional)
+
+        Yields:
+            Enriched businesses in input order
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='enrich')
+        pending = deque()
+        try:
+            for business in businesses:
+                pending.append(executor.submit(self.enrich_one, business, progress))
+                if len(pending) >= self.max_workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # If the export stops early, skip the lookups still queued behind it
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def enrich(self, businesses: Iterable[Dict], progress: Optional[ProgressCallback] = None) -> List[Dict]:
+        """
+        Enrich a list of businesses.
+
+        Args:
+            businesses: Businesses from a search
+            progress: Callback told about rate-limit waits (optional)
+
+        Returns:
+            Enriched businesses in input order
+        """
+        return list(self.iter_enrich(businesses, progress))
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of businesses fetched, skipped and failed so far."""
+        return {'fetched': self.fetched, 'skipped': self.skipped, 'failed': self.failed}
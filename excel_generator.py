@@ -1,15 +1,116 @@
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Iterable, Iterator, Optional, Union
 from datetime import datetime
 import os
-from config import EXCEL_COLUMNS
+from itertools import chain, islice
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from config import EXCEL_COLUMNS, ENRICHED_COLUMNS, EXCEL_WIDTH_SAMPLE_ROWS
+from summary_accumulator import SummaryAccumulator
+from progress import ProgressCallback, report_rows
+
+def resolve_output_path(filename: Optional[str] = None, extension: str = '.xlsx') -> str:
+    """
+    Resolve the output path for an export.
+    
+    Args:
+        filename: Output filename (optional)
+        extension: File extension to enforce, including the dot
+        
+    Returns:
+        Path inside the output directory
+    """
+    # Generate filename if not provided
+    if not filename:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"business_mailing_list_{timestamp}{extension}"
+    
+    # Ensure the expected extension
+    if not filename.endswith(extension):
+        filename += extension
+    
+    # Create output directory if it doesn't exist
+    output_dir = 'output'
+    os.makedirs(output_dir, exist_ok=True)
+    
+    return os.path.join(output_dir, filename)
+
+class ColumnWidthTracker:
+    """
+    Running maximum of value lengths per column.
+    
+    Rows are fed in as they are formatted, so widths can be applied once at
+    the end without re-reading any worksheet cells.
+    """
+    
+    def __init__(self, columns: List[str], padding: int = 2, max_width: int = 50):
+        """
+        Initialize the tracker with the header row.
+        
+        Args:
+            columns: Column headers, which count towards the widths
+            padding: Extra characters added to each width
+            max_width: Widest any column is allowed to get
+        """
+        self.padding = padding
+        self.max_width = max_width
+        self.lengths = [len(str(column)) for column in columns]
+    
+    def update(self, row: Iterable) -> None:
+        """Fold one row of values into the running maximums."""
+        lengths = self.lengths
+        for index, value in enumerate(row):
+            if value is None:
+                continue
+            length = len(value) if isinstance(value, str) else len(str(value))
+            if length > lengths[index]:
+                lengths[index] = length
+    
+    @property
+    def widths(self) -> List[int]:
+        """Column widths with padding, capped at max_width."""
+        return [min(length + self.padding, self.max_width) for length in self.lengths]
+    
+    def apply(self, worksheet) -> None:
+        """Set column widths on an openpyxl worksheet."""
+        for index, width in enumerate(self.widths, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+
+# Yelp numbers days from 0 = Monday
+DAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+def format_hours(hours: Optional[List[Dict]]) -> str:
+    """
+    Render Yelp's regular opening hours as text, e.g. "Mon 0900-1700; Tue 0900-1700".
+    
+    Args:
+        hours: 'hours' list from a business details response
+        
+    Returns:
+        Opening hours by day, or "" if there are none
+    """
+    for schedule in hours or []:
+        if schedule.get('hours_type', 'REGULAR') == 'REGULAR':
+            return '; '.join(
+                f"{DAY_NAMES[slot.get('day', 0) % 7]} {slot.get('start', '')}-{slot.get('end', '')}"
+                for slot in schedule.get('open', [])
+            )
+    return ''
 
 class ExcelGenerator:
-    def __init__(self):
-        """Initialize Excel generator."""
-        pass
+    def __init__(self, columns: Optional[List[str]] = None):
+        """
+        Initialize Excel generator.
+        
+        Args:
+            columns: Export columns (defaults to EXCEL_COLUMNS). Columns from
+                ENRICHED_COLUMNS are filled from business details merged in
+                by enrichment.BusinessEnricher.
+        """
+        self.columns = list(columns) if columns else list(EXCEL_COLUMNS)
+        self.enriched = [column for column in self.columns if column in ENRICHED_COLUMNS]
     
-    def format_business_data(self, businesses: List[Dict]) -> List[Dict]:
+    def format_business_data(self, businesses: Iterable[Dict]) -> List[Dict]:
         """
         Format business data for Excel export.
         
@@ -19,8 +120,22 @@ class ExcelGenerator:
         Returns:
             List of formatted business dictionaries
         """
-        formatted_data = []
+        return list(self.iter_format_business_data(businesses))
+    
+    def iter_format_business_data(self, businesses: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Format business data for Excel export one row at a time.
+        
+        Accepts any iterable, including the streams returned by
+        YelpAPIClient.iter_businesses, so rows can be written while later
+        pages are still being fetched.
         
+        Args:
+            businesses: Iterable of business dictionaries from Yelp API
+            
+        Yields:
+            Formatted business dictionaries
+        """
         for business in businesses:
             # Extract location information
             location = business.get('location', {})
@@ -63,10 +178,106 @@ class ExcelGenerator:
                 'Price Level': price_level,
                 'Yelp URL': business.get('url', '')
             }
+            if self.enriched:
+                formatted_business.update(self.format_enriched_fields(business))
             
-            formatted_data.append(formatted_business)
+            yield formatted_business
+    
+    def format_enriched_fields(self, business: Dict) -> Dict:
+        """
+        Format the optional columns that come from business details.
         
-        return formatted_data
+        Args:
+            business: Business dictionary, with details merged in if enriched
+            
+        Returns:
+            Values for this generator's ENRICHED_COLUMNS, blank when unknown
+        """
+        claimed = business.get('is_claimed')
+        values = {
+            'Hours': format_hours(business.get('hours')),
+            'Photos': ' '.join(business.get('photos') or []),
+            'Claimed': '' if claimed is None else ('Yes' if claimed else 'No')
+        }
+        return {column: values.get(column, '') for column in self.enriched}
+    
+    def format_business_frame(self, businesses: Iterable[Dict]) -> pd.DataFrame:
+        """
+        Format business data for Excel export as a DataFrame in one batch.
+        
+        Produces the same values as format_business_data. Fields are pulled
+        out of the Yelp JSON one column at a time with Python loops; phones,
+        prices and addresses are then cleaned with whole-column string
+        operations, which pandas backs with pyarrow when it is installed.
+        Only modestly faster than the row loop, and mostly on large lists
+        (see benchmarks/bench_format.py), so export_to_excel keeps to the
+        row loop, which sizes columns in the same pass.
+        
+        Args:
+            businesses: Iterable of business dictionaries from Yelp API
+            
+        Returns:
+            DataFrame with columns in this generator's column order
+        """
+        businesses = businesses if isinstance(businesses, list) else list(businesses)
+        locations = [business.get('location', {}) for business in businesses]
+        
+        def field(records: List[Dict], key: str) -> pd.Series:
+            return pd.Series([record.get(key, '') for record in records])
+        
+        def text(series: pd.Series) -> pd.Series:
+            # Render values the way an f-string would, None included
+            return series.astype('str').fillna('None')
+        
+        city = field(locations, 'city')
+        state = field(locations, 'state')
+        zip_code = field(locations, 'zip_code')
+        
+        # Combine address components
+        full_address = (text(field(locations, 'address1')) + ', ' + text(city) + ', '
+                        + text(state) + ' ' + text(zip_code)).str.strip()
+        full_address = full_address.mask(full_address.str.startswith(', '), full_address.str[2:])
+        
+        # Remove any non-digit characters except + for international numbers
+        phone = field(businesses, 'phone')
+        has_phone = phone.astype(bool)
+        phone = phone.mask(has_phone, phone[has_phone].astype('str').str.replace(r'[^\d+]', '', regex=True))
+        
+        # One '$' per character of the price level
+        price_level = field(businesses, 'price')
+        has_price = price_level.astype(bool)
+        price_level = price_level.mask(has_price,
+                                       price_level[has_price].astype('str').str.replace(r'(?s).', '$', regex=True))
+        
+        # Category titles are ragged lists, so join them while flattening
+        business_type = pd.Series([
+            ', '.join([cat.get('title', '') for cat in categories]) if categories else ''
+            for categories in (business.get('categories', []) for business in businesses)
+        ])
+        
+        url = field(businesses, 'url')
+        
+        # Enriched columns are ragged too, so they are formatted per row
+        enriched = {}
+        if self.enriched:
+            rows = [self.format_enriched_fields(business) for business in businesses]
+            enriched = {column: pd.Series([row[column] for row in rows]) for column in self.enriched}
+        
+        return pd.DataFrame({
+            'Business Name': field(businesses, 'name'),
+            'Address': full_address,
+            'City': city,
+            'State': state,
+            'ZIP Code': zip_code,
+            'Phone': phone,
+            'Website': url,
+            'Business Type': business_type,
+            'Rating': field(businesses, 'rating'),
+            'Review Count': field(businesses, 'review_count'),
+            'Price Level': price_level,
+            'Yelp URL': url.copy(),
+            **enriched
+        }, columns=self.columns)
     
     def export_to_excel(self, 
                        businesses: List[Dict], 
@@ -87,55 +298,27 @@ class ExcelGenerator:
             print("No businesses to export.")
             return ""
         
-        # Format the data
-        formatted_data = self.format_business_data(businesses)
-        
-        # Create DataFrame
-        df = pd.DataFrame(formatted_data)
-        
-        # Reorder columns to match EXCEL_COLUMNS
-        df = df[EXCEL_COLUMNS]
-        
-        # Generate filename if not provided
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"business_mailing_list_{timestamp}.xlsx"
-        
-        # Ensure .xlsx extension
-        if not filename.endswith('.xlsx'):
-            filename += '.xlsx'
+        # Format the data, tracking column widths as rows go past
+        widths = ColumnWidthTracker(self.columns)
+        formatted_data = []
+        for formatted in self.iter_format_business_data(businesses):
+            widths.update(formatted[column] for column in self.columns)
+            formatted_data.append(formatted)
         
-        # Create output directory if it doesn't exist
-        output_dir = 'output'
-        os.makedirs(output_dir, exist_ok=True)
+        # Create DataFrame with columns in this generator's column order
+        df = pd.DataFrame(formatted_data, columns=self.columns)
         
-        filepath = os.path.join(output_dir, filename)
+        filepath = resolve_output_path(filename)
         
         # Export to Excel
         with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
             df.to_excel(writer, sheet_name=sheet_name, index=False)
             
-            # Get the workbook and worksheet
-            workbook = writer.book
-            worksheet = writer.sheets[sheet_name]
-            
             # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                
-                adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+            widths.apply(writer.sheets[sheet_name])
         
         print(f"Excel file created: {filepath}")
-        print(f"Total businesses exported: {len(formatted_data)}")
+        print(f"Total businesses exported: {len(df)}")
         
         return filepath
     
@@ -154,45 +337,94 @@ class ExcelGenerator:
         if not businesses:
             return
         
-        # Calculate statistics
-        total_businesses = len(businesses)
-        
-        # Count by business type
-        business_types = {}
-        for business in businesses:
-            categories = business.get('categories', [])
-            for category in categories:
-                cat_title = category.get('title', '')
-                business_types[cat_title] = business_types.get(cat_title, 0) + 1
-        
-        # Count by city
-        cities = {}
-        for business in businesses:
-            location = business.get('location', {})
-            city = location.get('city', 'Unknown')
-            cities[city] = cities.get(city, 0) + 1
-        
-        # Create summary data
-        summary_data = {
-            'Metric': [
-                'Total Businesses',
-                'Average Rating',
-                'Businesses with Phone',
-                'Businesses with Website',
-                'Top Business Type',
-                'Top City'
-            ],
-            'Value': [
-                total_businesses,
-                f"{sum(b.get('rating', 0) for b in businesses) / total_businesses:.1f}",
-                sum(1 for b in businesses if b.get('phone')),
-                sum(1 for b in businesses if b.get('url')),
-                max(business_types.items(), key=lambda x: x[1])[0] if business_types else 'N/A',
-                max(cities.items(), key=lambda x: x[1])[0] if cities else 'N/A'
-            ]
-        }
+        # Calculate statistics in a single pass
+        summary_data = SummaryAccumulator().add_many(businesses).summary_data()
         
         # Add to existing Excel file
         with pd.ExcelWriter(filepath, engine='openpyxl', mode='a') as writer:
             summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name=summary_sheet_name, index=False) 
\ No newline at end of file
+            summary_df.to_excel(writer, sheet_name=summary_sheet_name, index=False)
+    
+    def export_streaming(self,
+                         businesses: Iterable[Dict],
+                         filename: Optional[Union[str, BinaryIO]] = None,
+                         sheet_name: str = 'Business Mailing List',
+                         summary_sheet_name: str = 'Summary',
+                         accumulator: Optional[SummaryAccumulator] = None,
+                         progress: Optional[ProgressCallback] = None) -> Union[str, BinaryIO]:
+        """
+        Export business data and its summary sheet in a single streaming pass.
+        
+        Rows are pulled from the iterable and written through a write-only
+        workbook, so memory stays flat however many businesses there are and
+        the file is never reopened. Column widths are sized from the first
+        EXCEL_WIDTH_SAMPLE_ROWS rows, since a write-only sheet needs them
+        before any row is written.
+        
+        Args:
+            businesses: Iterable of business dictionaries, e.g. from
+                YelpAPIClient.iter_businesses
+            filename: Output filename (optional), or a seekable binary file
+                object such as an in-memory buffer to write the workbook into
+            sheet_name: Excel sheet name
+            summary_sheet_name: Name for the summary sheet
+            accumulator: Summary accumulator to fill (optional), letting the
+                caller read the statistics back after the export
+            progress: Callback told about export stages and rows written
+                (optional), e.g. a progress.ProgressReporter
+            
+        Returns:
+            Path to the created Excel file (or the file object written to),
+            or "" if there was nothing to export
+        """
+        businesses = iter(businesses)
+        first = next(businesses, None)
+        if first is None:
+            print("No businesses to export.")
+            return ""
+        
+        in_memory = hasattr(filename, 'write')
+        filepath = filename if in_memory else resolve_output_path(filename)
+        if progress is not None:
+            progress('stage', stage='exporting')
+        
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(sheet_name)
+        
+        # Summary statistics are gathered as rows go past
+        accumulator = accumulator if accumulator is not None else SummaryAccumulator()
+        rows = (
+            [formatted[column] for column in self.columns]
+            for formatted in self.iter_format_business_data(accumulator.track(chain([first], businesses)))
+        )
+        
+        # Write-only sheets need column widths before the first row
+        sample = list(islice(rows, EXCEL_WIDTH_SAMPLE_ROWS))
+        widths = ColumnWidthTracker(self.columns)
+        for row in sample:
+            widths.update(row)
+        widths.apply(worksheet)
+        
+        worksheet.append(self.columns)
+        for row in report_rows(chain(sample, rows), progress):
+            worksheet.append(row)
+        
+        if progress is not None:
+            progress('stage', stage='summarizing')
+        summary_data = accumulator.summary_data()
+        summary_sheet = workbook.create_sheet(summary_sheet_name)
+        summary_sheet.append(list(summary_data.keys()))
+        for row in zip(*summary_data.values()):
+            summary_sheet.append(list(row))
+        
+        if progress is not None:
+            progress('stage', stage='saving')
+        workbook.save(filepath)
+        
+        if in_memory:
+            print("Excel workbook written to buffer")
+        else:
+            print(f"Excel file created: {filepath}")
+        print(f"Total businesses exported: {accumulator.total}")
+        
+        return filepath
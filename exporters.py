@@ -0,0 +1,257 @@
+import csv
+import io
+import json
+import tempfile
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+from excel_generator import ExcelGenerator, resolve_output_path
+from summary_accumulator import SummaryAccumulator
+from progress import ProgressCallback, report_rows
+from config import EXPORT_BATCH_ROWS, EXPORT_SPOOL_MAX_BYTES
+
+class Exporter:
+    """
+    Base class for mailing list writers.
+
+    Subclasses stream formatted rows (keyed by the generator's columns) to a file in
+    their own format. Every exporter accepts any iterable of Yelp business
+    dictionaries, so results can be written while pages are still arriving.
+    """
+
+    name = ''
+    extension = ''
+    mimetype = 'application/octet-stream'
+
+    def __init__(self, excel_generator: Optional[ExcelGenerator] = None):
+        """
+        Initialize the exporter.
+
+        Args:
+            excel_generator: Generator whose row formatting is reused
+        """
+        self.excel_generator = excel_generator or ExcelGenerator()
+
+    def export(self,
+               businesses: Iterable[Dict],
+               filename: Optional[str] = None,
+               accumulator: Optional[SummaryAccumulator] = None,
+               progress: Optional[ProgressCallback] = None) -> str:
+        """
+        Export business data to a file.
+
+        Args:
+            businesses: Iterable of business dictionaries
+            filename: Output filename (optional)
+            accumulator: Summary accumulator to fill (optional)
+            progress: Callback told about the export stage and rows written (optional)
+
+        Returns:
+            Path to the created file, or "" if there was nothing to export
+        """
+        accumulator = accumulator if accumulator is not None else SummaryAccumulator()
+        filepath = resolve_output_path(filename, self.extension)
+        if not self._export(businesses, filepath, accumulator, progress):
+            return ""
+
+        print(f"{self.name} file created: {filepath}")
+        print(f"Total businesses exported: {accumulator.total}")
+
+        return filepath
+
+    def export_to_buffer(self,
+                         businesses: Iterable[Dict],
+                         accumulator: Optional[SummaryAccumulator] = None,
+                         progress: Optional[ProgressCallback] = None,
+                         max_memory: int = EXPORT_SPOOL_MAX_BYTES) -> Optional[BinaryIO]:
+        """
+        Export business data into a spooled buffer instead of a named file.
+
+        The buffer stays in memory until it grows past max_memory, then
+        spills to an anonymous temporary file that disappears when closed.
+
+        Args:
+            businesses: Iterable of business dictionaries
+            accumulator: Summary accumulator to fill (optional)
+            progress: Callback told about the export stage and rows written (optional)
+            max_memory: Bytes kept in memory before spilling to disk
+
+        Returns:
+            Buffer rewound to the start, or None if there was nothing to export
+        """
+        accumulator = accumulator if accumulator is not None else SummaryAccumulator()
+        buffer = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        if not self._export(businesses, buffer, accumulator, progress):
+            buffer.close()
+            return None
+
+        buffer.seek(0)
+        print(f"{self.name} export buffered: {accumulator.total} businesses")
+        return buffer
+
+    def _export(self,
+                businesses: Iterable[Dict],
+                target: Union[str, BinaryIO],
+                accumulator: SummaryAccumulator,
+                progress: Optional[ProgressCallback]) -> bool:
+        """
+        Format businesses and write them to a path or binary file.
+
+        Returns:
+            False if there was nothing to export
+        """
+        businesses = iter(businesses)
+        first = next(businesses, None)
+        if first is None:
+            print("No businesses to export.")
+            return False
+
+        if progress is not None:
+            progress('stage', stage='exporting')
+        rows = report_rows(self.excel_generator.iter_format_business_data(
+            accumulator.track(chain([first], businesses))), progress)
+
+        self.write(rows, target)
+        return True
+
+    def write(self, rows: Iterator[Dict], target: Union[str, BinaryIO]) -> None:
+        """
+        Write formatted rows to a file.
+
+        Args:
+            rows: Formatted business dictionaries keyed by the generator's columns
+            target: Destination path, or a binary file object
+        """
+        raise NotImplementedError
+
+@contextmanager
+def _open_text(target: Union[str, BinaryIO]) -> Iterator[TextIO]:
+    """Open a path, or wrap a binary file object, for UTF-8 text writing."""
+    if isinstance(target, str):
+        with open(target, 'w', newline='', encoding='utf-8') as f:
+            yield f
+        return
+
+    wrapper = io.TextIOWrapper(target, encoding='utf-8', newline='')
+    try:
+        yield wrapper
+        wrapper.flush()
+    finally:
+        # Leave the caller's file object open
+        wrapper.detach()
+
+class XLSXExporter(Exporter):
+    """Excel workbook with a summary sheet, via ExcelGenerator.export_streaming."""
+
+    name = 'Excel'
+    extension = '.xlsx'
+    mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    def export(self,
+               businesses: Iterable[Dict],
+               filename: Optional[str] = None,
+               accumulator: Optional[SummaryAccumulator] = None,
+               progress: Optional[ProgressCallback] = None) -> str:
+        return self.excel_generator.export_streaming(businesses, filename, accumulator=accumulator,
+                                                     progress=progress)
+
+    def _export(self,
+                businesses: Iterable[Dict],
+                target: Union[str, BinaryIO],
+                accumulator: SummaryAccumulator,
+                progress: Optional[ProgressCallback]) -> bool:
+        return bool(self.excel_generator.export_streaming(businesses, target, accumulator=accumulator,
+                                                          progress=progress))
+
+class CSVExporter(Exporter):
+    """Comma-separated values with a header row of the export columns."""
+
+    name = 'CSV'
+    extension = '.csv'
+    mimetype = 'text/csv'
+
+    def write(self, rows: Iterator[Dict], target: Union[str, BinaryIO]) -> None:
+        with _open_text(target) as f:
+            writer = csv.DictWriter(f, fieldnames=self.excel_generator.columns, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+
+class JSONLinesExporter(Exporter):
+    """One JSON object per line, keyed by the export columns."""
+
+    name = 'JSON Lines'
+    extension = '.jsonl'
+    mimetype = 'application/x-ndjson'
+
+    def write(self, rows: Iterator[Dict], target: Union[str, BinaryIO]) -> None:
+        with _open_text(target) as f:
+            for row in rows:
+                f.write(json.dumps({column: row[column] for column in self.excel_generator.columns},
+                                   ensure_ascii=False))
+                f.write('\n')
+
+class ParquetExporter(Exporter):
+    """Columnar Parquet file, written in row groups of EXPORT_BATCH_ROWS."""
+
+    name = 'Parquet'
+    extension = '.parquet'
+    mimetype = 'application/vnd.apache.parquet'
+
+    NUMERIC_COLUMNS = {'Rating': 'float64', 'Review Count': 'int64'}
+
+    def write(self, rows: Iterator[Dict], target: Union[str, BinaryIO]) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+
+        schema = pa.schema([
+            (column, getattr(pa, self.NUMERIC_COLUMNS.get(column, 'string'))())
+            for column in self.excel_generator.columns
+        ])
+
+        with pq.ParquetWriter(target, schema) as writer:
+            while True:
+                batch = list(islice(rows, EXPORT_BATCH_ROWS))
+                if not batch:
+                    break
+                writer.write_table(pa.table(self._columns(batch), schema=schema))
+
+    def _columns(self, batch: List[Dict]) -> Dict[str, List]:
+        """Pivot a batch of rows into columns, mapping blanks in numeric columns to null."""
+        columns = {}
+        for column in self.excel_generator.columns:
+            values = [row[column] for row in batch]
+            if column in self.NUMERIC_COLUMNS:
+                values = [None if value == '' else value for value in values]
+            else:
+                values = [None if value is None else str(value) for value in values]
+            columns[column] = values
+        return columns
+
+# Output formats selectable from the CLI and web interface
+EXPORTERS = {
+    'xlsx': XLSXExporter,
+    'csv': CSVExporter,
+    'jsonl': JSONLinesExporter,
+    'parquet': ParquetExporter
+}
+
+def get_exporter(output_format: str = 'xlsx',
+                 excel_generator: Optional[ExcelGenerator] = None) -> Exporter:
+    """
+    Look up an exporter by format name.
+
+    Args:
+        output_format: One of the keys of EXPORTERS
+        excel_generator: Generator whose row formatting is reused
+
+    Returns:
+        Exporter instance
+    """
+    exporter_class = EXPORTERS.get((output_format or 'xlsx').lower().lstrip('.'))
+    if exporter_class is None:
+        raise ValueError(f"Unsupported output format '{output_format}'. "
+                         f"Choose from: {', '.join(EXPORTERS)}")
+    return exporter_class(excel_generator)
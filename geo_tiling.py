@@ -0,0 +1,194 @@
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional, NamedTuple
+from yelp_api_client import YelpAPIClient
+from config import DEFAULT_LIMIT, MAX_RESULTS, SEARCH_MAX_WORKERS, TILE_MIN_RADIUS
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE_LAT = 111320
+
+class Tile(NamedTuple):
+    """
+    A square search area and the circle circumscribing it.
+
+    The root tile is the search circle itself, with half_side equal to its
+    radius, so its square is the circle's bounding square.
+    """
+    latitude: float
+    longitude: float
+    radius: float
+    half_side: float
+
+def distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+def subdivide(tile: Tile) -> List[Tile]:
+    """
+    Split a tile's square into four quadrant squares.
+
+    Each quadrant is centered half a half-side out on each axis and covered
+    by its own circumscribing circle. Children are derived from their
+    squares, not from the parent circle, so a child's radius is half its
+    parent's below the root and overlap between tiles stays constant.
+    """
+    half = tile.half_side / 2
+    dlat = half / METERS_PER_DEGREE_LAT
+    dlon = half / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(tile.latitude)), 1e-6))
+    return [
+        Tile(tile.latitude + sy * dlat, tile.longitude + sx * dlon, half * math.sqrt(2), half)
+        for sy in (1, -1)
+        for sx in (-1, 1)
+    ]
+
+class TiledSearch:
+    """
+    Quadtree search that gets past Yelp's 1000-result offset ceiling.
+
+    Each tile is probed with a single page. Tiles whose reported total is at
+    or over the cap are split into four sub-tiles; the rest are paged out in
+    full. Tiles at the same depth run concurrently and results are
+    deduplicated by business id and streamed as each depth completes.
+    """
+
+    def __init__(self,
+                 client: YelpAPIClient,
+                 max_workers: int = SEARCH_MAX_WORKERS,
+                 min_radius: int = TILE_MIN_RADIUS,
+                 result_cap: int = MAX_RESULTS,
+                 limit: int = DEFAULT_LIMIT):
+        """
+        Initialize the tiled search.
+
+        Args:
+            client: Yelp API client used for all requests
+            max_workers: Maximum requests in flight
+            min_radius: Tiles are never split below this radius in meters
+            result_cap: Reported total at which a tile gets split
+            limit: Number of results per request
+        """
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.min_radius = min_radius
+        self.result_cap = result_cap
+        self.limit = limit
+
+    def search_location(self,
+                        location: str,
+                        business_type: Optional[str] = None,
+                        radius: int = 40000,
+                        max_results: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Tile a search around a city, state, or ZIP code.
+
+        Args:
+            location: City, state, or ZIP code
+            business_type: Category of business to search for
+            radius: Search radius in meters
+            max_results: Optional cap on returned businesses
+
+        Yields:
+            Unique business dictionaries
+        """
+        center = self.client.locate(location)
+        if center is None:
+            return
+        yield from self.search(center[0], center[1], business_type, radius, max_results)
+
+    def search(self,
+               latitude: float,
+               longitude: float,
+               business_type: Optional[str] = None,
+               radius: int = 40000,
+               max_results: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Tile a search around a point.
+
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            business_type: Category of business to search for
+            radius: Search radius in meters
+            max_results: Optional cap on returned businesses
+
+        Yields:
+            Unique business dictionaries within the search circle
+        """
+        root = Tile(latitude, longitude, radius, radius)
+        seen = set()
+        count = 0
+
+        def collect(page: Optional[Dict]) -> Iterator[Dict]:
+            for business in (page or {}).get('businesses', []):
+                business_id = business.get('id')
+                if business_id in seen or not self._within(business, root):
+                    continue
+                seen.add(business_id)
+                yield business
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tile')
+        try:
+            level = [root]
+            while level:
+                probes = list(executor.map(lambda tile: self._fetch(tile, business_type, 0), level))
+
+                next_level = []
+                remaining_pages = []
+                for tile, page in zip(level, probes):
+                    if not page:
+                        continue
+
+                    total = page.get('total', 0)
+                    if total >= self.result_cap and tile.half_side / 2 * math.sqrt(2) >= self.min_radius:
+                        next_level.extend(child for child in subdivide(tile)
+                                          if self._intersects(child, root))
+                    else:
+                        stop = min(total, self.result_cap)
+                        remaining_pages.extend((tile, offset)
+                                               for offset in range(self.limit, stop, self.limit))
+
+                pages = executor.map(lambda job: self._fetch(job[0], business_type, job[1]),
+                                     remaining_pages)
+                for page in itertools.chain(probes, pages):
+                    for business in collect(page):
+                        yield business
+                        count += 1
+                        if max_results and count >= max_results:
+                            return
+
+                level = next_level
+        finally:
+            # Once max_results is reached, queued tile pages would only burn quota
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, tile: Tile, business_type: Optional[str], offset: int) -> Optional[Dict]:
+        """Fetch one page of results for a tile."""
+        return self.client.search_by_coordinates_page(
+            latitude=tile.latitude,
+            longitude=tile.longitude,
+            business_type=business_type,
+            radius=int(math.ceil(tile.radius)),
+            limit=min(self.limit, self.result_cap - offset),
+            offset=offset
+        )
+
+    @staticmethod
+    def _intersects(tile: Tile, root: Tile) -> bool:
+        """Whether a tile overlaps the root search circle."""
+        return distance_meters(tile.latitude, tile.longitude,
+                               root.latitude, root.longitude) < tile.radius + root.radius
+
+    @staticmethod
+    def _within(business: Dict, root: Tile) -> bool:
+        """Whether a business lies inside the root search circle."""
+        coordinates = business.get('coordinates') or {}
+        latitude = coordinates.get('latitude')
+        longitude = coordinates.get('longitude')
+        if latitude is None or longitude is None:
+            return True
+        return distance_meters(latitude, longitude, root.latitude, root.longitude) <= root.radius
@@ -0,0 +1,331 @@
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from progress import ProgressReporter
+from config import JOB_MAX_WORKERS, JOB_WORKER_MODE, JOB_DB_PATH, JOB_PRUNE_INTERVAL
+
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+
+class Job:
+    """A unit of background work and its outcome."""
+
+    def __init__(self,
+                 params: Dict,
+                 job_id: Optional[str] = None,
+                 status: str = QUEUED,
+                 result: Optional[Dict] = None,
+                 error: Optional[str] = None,
+                 created_at: Optional[float] = None,
+                 started_at: Optional[float] = None,
+                 finished_at: Optional[float] = None,
+                 owner_pid: Optional[int] = None):
+        self.id = job_id or str(uuid.uuid4())
+        self.params = params
+        self.status = status
+        self.result = result
+        self.error = error
+        self.created_at = created_at or time.time()
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.owner_pid = owner_pid or os.getpid()
+        self.progress = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has finished or failed."""
+        return self.status in (FINISHED, FAILED)
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable view of the job for status endpoints."""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'progress': dict(self.progress.totals) if self.progress is not None else None
+        }
+
+class JobQueue:
+    """
+    In-process job queue run by a pool of background workers.
+
+    Jobs are plain parameter dictionaries handed to a runner function
+    along with a progress callback, and the runner's return value becomes
+    the job result. Workers are threads by default, and each job gets a
+    ProgressReporter that event streams can follow. With mode='process'
+    the runner and its parameters must be picklable, and the runner gets
+    no progress callback since events can't cross the process boundary.
+    When db_path is set, job state is also written to SQLite so other
+    worker processes on the same machine can report on it. With a
+    retention, settled jobs go on a heap of expiry times and a daemon
+    thread forgets them every prune_interval seconds.
+    """
+
+    def __init__(self,
+                 runner: Callable[[Dict, Optional[ProgressReporter]], Dict],
+                 on_complete: Optional[Callable[[Job], None]] = None,
+                 initializer: Optional[Callable[[], None]] = None,
+                 max_workers: int = JOB_MAX_WORKERS,
+                 mode: str = JOB_WORKER_MODE,
+                 db_path: Optional[str] = JOB_DB_PATH,
+                 retention: Optional[float] = None,
+                 prune_interval: float = JOB_PRUNE_INTERVAL):
+        """
+        Initialize the queue without starting any workers.
+
+        Args:
+            runner: Function run with each job's parameters and progress callback
+            on_complete: Called in this process with each job once it settles
+            initializer: Called once in each worker thread or process as it starts (optional)
+            max_workers: Number of background workers
+            mode: 'thread' or 'process'
+            db_path: SQLite file for shared job state (optional)
+            retention: Seconds settled jobs are kept (None keeps them all)
+            prune_interval: Seconds between background sweeps for expired jobs
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Unsupported job worker mode '{mode}'. Choose 'thread' or 'process'")
+
+        self.runner = runner
+        self.on_complete = on_complete
+        self.initializer = initializer
+        self.max_workers = max(1, max_workers)
+        self.mode = mode
+        self.db_path = db_path or None
+        self.retention = retention
+        self.prune_interval = prune_interval
+
+        self._jobs = {}
+        self._futures = {}
+        self._expiry = []  # (expires_at, job_id) of settled jobs
+        self._executor = None
+        self._lock = threading.Lock()
+
+        self._pruner = None
+        self._stopped = threading.Event()
+
+        self._conn = None
+        if self.db_path:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            with self._lock, self._conn:
+                self._conn.execute('PRAGMA journal_mode=WAL')
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL,
+                        params TEXT NOT NULL,
+                        result TEXT,
+                        error TEXT,
+                        created_at REAL NOT NULL,
+                        started_at REAL,
+                        finished_at REAL,
+                        owner_pid INTEGER NOT NULL
+                    )
+                ''')
+                self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)')
+
+    def _get_executor(self) -> Executor:
+        """Start the worker pool on first use."""
+        if self._executor is None:
+            if self.mode == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                      initializer=self.initializer)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                     thread_name_prefix='job-worker',
+                                                     initializer=self.initializer)
+        return self._executor
+
+    def submit(self, params: Dict) -> Job:
+        """
+        Enqueue a job.
+
+        Args:
+            params: Parameters passed to the runner
+
+        Returns:
+            The queued job
+        """
+        job = Job(params)
+        with self._lock:
+            self._jobs[job.id] = job
+            executor = self._get_executor()
+        self._save(job)
+        self._start_pruner()
+
+        if self.mode == 'process':
+            future = executor.submit(self.runner, params, None)
+        else:
+            job.progress = ProgressReporter()
+            future = executor.submit(self._execute, job)
+        with self._lock:
+            self._futures[job.id] = future
+        future.add_done_callback(lambda future: self._complete(job, future))
+        return job
+
+    def _execute(self, job: Job) -> Dict:
+        """Run a job on a worker thread."""
+        self._mark_running(job)
+        return self.runner(job.params, job.progress)
+
+    def _mark_running(self, job: Job) -> None:
+        """Record that a job has started."""
+        if job.status != QUEUED:
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._save(job)
+
+    def _complete(self, job: Job, future: Future) -> None:
+        """Record a job's result or error once its future settles."""
+        try:
+            job.result = future.result()
+            job.status = FINISHED
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            job.status = FAILED
+        job.finished_at = time.time()
+        with self._lock:
+            self._futures.pop(job.id, None)
+            if self.retention is not None:
+                heapq.heappush(self._expiry, (job.finished_at + self.retention, job.id))
+        self._save(job)
+        if job.progress is not None:
+            job.progress.close(job.status)
+
+        if self.on_complete is not None:
+            try:
+                self.on_complete(job)
+            except Exception as e:
+                print(f"Error in job completion hook: {e}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Look up a job by id.
+
+        Jobs submitted by this process are answered from memory; others are
+        read from the SQLite backing when one is configured.
+
+        Args:
+            job_id: Id returned by submit
+
+        Returns:
+            The job, or None if it is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            future = self._futures.get(job_id)
+        if job is not None:
+            if future is not None and future.running():
+                self._mark_running(job)
+            return job
+        return self._load(job_id)
+
+    def prune(self) -> int:
+        """
+        Forget jobs that settled more than retention seconds ago.
+
+        Expired jobs are popped off the expiry heap, so the cost depends on
+        how many expired rather than on how many jobs are held.
+
+        Returns:
+            Number of jobs dropped from memory
+        """
+        if self.retention is None:
+            return 0
+        now = time.time()
+        dropped = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, job_id = heapq.heappop(self._expiry)
+                if self._jobs.pop(job_id, None) is not None:
+                    dropped += 1
+            if self._conn is not None:
+                # Rows written by other worker processes expire here too
+                with self._conn:
+                    self._conn.execute('DELETE FROM jobs WHERE finished_at < ?', (now - self.retention,))
+        return dropped
+
+    def _start_pruner(self) -> None:
+        """Start the background pruner on first use."""
+        if self._pruner is not None or self.retention is None or self.prune_interval <= 0:
+            return
+        with self._lock:
+            if self._pruner is None:
+                self._pruner = threading.Thread(target=self._prune_loop, name='job-pruner', daemon=True)
+                self._pruner.start()
+
+    def _prune_loop(self) -> None:
+        while not self._stopped.wait(self.prune_interval):
+            try:
+                self.prune()
+            except Exception as e:
+                print(f"Error pruning jobs: {e}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers and the pruner, and close the SQLite backing."""
+        self._stopped.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _save(self, job: Job) -> None:
+        """Write a job's state to the SQLite backing, if any."""
+        if self._conn is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job.id, job.status, json.dumps(job.params),
+                 json.dumps(job.result) if job.result is not None else None,
+                 job.error, job.created_at, job.started_at, job.finished_at, job.owner_pid))
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        """Read a job written by any process from the SQLite backing."""
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, status, params, result, error, created_at, started_at, finished_at, owner_pid '
+                'FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = Job(job_id=row[0], status=row[1], params=json.loads(row[2]),
+                  result=json.loads(row[3]) if row[3] else None, error=row[4],
+                  created_at=row[5], started_at=row[6], finished_at=row[7], owner_pid=row[8])
+
+        # A job whose owning process has exited will never finish
+        if not job.done and not _pid_alive(job.owner_pid):
+            job.status = FAILED
+            job.error = 'Worker process exited before the job finished'
+        return job
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this id is still running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -8,70 +8,52 @@ and generate mailing lists in Excel format.
 
 import sys
 import os
-import json
-from typing import Optional
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
 from yelp_api_client import YelpAPIClient
 from excel_generator import ExcelGenerator
-from config import BUSINESS_CATEGORIES
-from difflib import get_close_matches
-
-# Load all Yelp categories from JSON
-CATEGORIES_FILE = 'yelp_categories.json'
-def load_all_categories():
-    try:
-        with open(CATEGORIES_FILE, 'r') as f:
-            categories = json.load(f)
-        return categories
-    except Exception as e:
-        print(f"❌ Error loading categories: {e}")
-        return []
-
-ALL_YELP_CATEGORIES = load_all_categories()
-CATEGORY_ALIASES = {cat['alias']: cat for cat in ALL_YELP_CATEGORIES}
-CATEGORY_TITLES = {cat['title'].lower(): cat for cat in ALL_YELP_CATEGORIES}
+from geo_tiling import TiledSearch
+from category_hierarchy import CategorySearch
+from exporters import EXPORTERS, Exporter, get_exporter
+from enrichment import BusinessEnricher
+from category_registry import get_category_registry
+from progress import ProgressCallback
+from business_store import BusinessStore, RefreshDelta, CHANGE_TYPES, get_business_store
+from config import BUSINESS_CATEGORIES, ENRICHED_COLUMNS, MAX_RESULTS
 
 class MailingListGenerator:
-    def __init__(self):
-        """Initialize the mailing list generator."""
-        try:
-            self.yelp_client = YelpAPIClient()
-            self.excel_generator = ExcelGenerator()
-            print("✅ Yelp API client initialized successfully")
-        except ValueError as e:
-            print(f"❌ Error: {e}")
-            print("Please make sure your YELP_API_KEY is set in the .env file")
-            sys.exit(1)
+    def __init__(self,
+                 yelp_client: Optional[YelpAPIClient] = None,
+                 excel_generator: Optional[ExcelGenerator] = None):
+        """
+        Initialize the mailing list generator.
+        
+        Neither the generator nor its default client keeps per-search state,
+        so one instance can serve many threads at once.
+        
+        Args:
+            yelp_client: Yelp API client to search with (defaults to a new one)
+            excel_generator: Excel generator to format with (defaults to a new one)
+            
+        Raises:
+            ValueError: If no Yelp API key is configured
+        """
+        self.yelp_client = yelp_client or YelpAPIClient()
+        self.excel_generator = excel_generator or ExcelGenerator()
     
     def display_categories(self, limit=50):
         """Display a sample of available Yelp business categories."""
         print("\n📋 Sample of Yelp Business Categories (showing first {}):".format(limit))
         print("-" * 50)
-        for i, cat in enumerate(ALL_YELP_CATEGORIES[:limit]):
+        categories = get_category_registry().categories
+        for i, cat in enumerate(categories[:limit]):
             print(f"  {cat['title']} (alias: {cat['alias']})")
-        print(f"...and {len(ALL_YELP_CATEGORIES) - limit} more. Type your business type or alias!")
+        print(f"...and {len(categories) - limit} more. Type your business type or alias!")
         print("-" * 50)
     
     def match_category(self, user_input: str) -> Optional[str]:
         """Match user input to the closest Yelp category alias."""
-        user_input = user_input.strip().lower()
-        if not user_input:
-            return None
-        # Direct alias match
-        if user_input in CATEGORY_ALIASES:
-            return user_input
-        # Direct title match
-        if user_input in CATEGORY_TITLES:
-            return CATEGORY_TITLES[user_input]['alias']
-        # Fuzzy match alias or title
-        all_keys = list(CATEGORY_ALIASES.keys()) + list(CATEGORY_TITLES.keys())
-        matches = get_close_matches(user_input, all_keys, n=1, cutoff=0.7)
-        if matches:
-            match = matches[0]
-            if match in CATEGORY_ALIASES:
-                return match
-            if match in CATEGORY_TITLES:
-                return CATEGORY_TITLES[match]['alias']
-        return None
+        return get_category_registry().match(user_input)
     
     def get_user_input(self) -> dict:
         """Get user input for search parameters."""
@@ -96,6 +78,13 @@ class MailingListGenerator:
         elif yelp_category:
             print(f"✅ Matched to Yelp category alias: {yelp_category}")
         
+        # Subcategories of a parent category
+        include_subcategories = False
+        subcategories = get_category_registry().hierarchy.descendants(yelp_category) if yelp_category else ()
+        if subcategories:
+            answer = input(f"🌳 Also search its {len(subcategories)} subcategories? (y/N): ").strip().lower()
+            include_subcategories = answer in ('y', 'yes')
+        
         # Search radius
         radius_input = input("🔍 Enter search radius in miles (default: 25, max: 24.85): ").strip()
         try:
@@ -116,28 +105,121 @@ class MailingListGenerator:
             print("⚠️  Invalid number. Using default 100 results.")
             max_results = 100
         
+        # Business details
+        answer = input("📇 Add opening hours, photos and claimed status? Costs one API call per business (y/N): ").strip().lower()
+        enrich = answer in ('y', 'yes')
+        
+        # Incremental refresh
+        answer = input("🔁 Only export what changed since the last run of this search? (y/N): ").strip().lower()
+        incremental = answer in ('y', 'yes')
+        
+        # Output format
+        output_format = input(f"📦 Enter output format ({', '.join(EXPORTERS)}; default: xlsx): ").strip().lower().lstrip('.')
+        if output_format not in EXPORTERS:
+            if output_format:
+                print(f"⚠️  Unknown format '{output_format}'. Using xlsx.")
+            output_format = 'xlsx'
+        extension = EXPORTERS[output_format].extension
+        
         # Filename
         filename = input("📄 Enter output filename (or press Enter for auto-generated): ").strip()
-        if filename and not filename.endswith('.xlsx'):
-            filename += '.xlsx'
+        if filename and not filename.endswith(extension):
+            filename += extension
         
         return {
             'location': location,
             'business_type': yelp_category,
+            'include_subcategories': include_subcategories,
             'radius': radius_meters,
             'max_results': max_results,
-            'filename': filename if filename else None
+            'filename': filename if filename else None,
+            'output_format': output_format,
+            'enrich': enrich,
+            'incremental': incremental
         }
     
+    def iter_search(self, params: dict, concurrent: bool = True,
+                    progress: Optional[ProgressCallback] = None) -> Iterable[Dict]:
+        """
+        Search for businesses, picking the strategy the parameters need.
+        
+        Searches over MAX_RESULTS are tiled, parent categories with
+        include_subcategories are fanned out over their children, and
+        everything else streams pages straight from the client. With enrich
+        set, each business's details are fetched and merged in as results
+        arrive.
+        
+        Args:
+            params: Dictionary containing search parameters
+            concurrent: Fetch result pages in parallel
+            progress: Callback told about each page and rate-limit wait (optional)
+            
+        Returns:
+            Iterable of business dictionaries
+        """
+        businesses = self._search(params, concurrent, progress)
+        if params.get('enrich'):
+            businesses = BusinessEnricher(self.yelp_client).iter_enrich(businesses, progress)
+        return businesses
+    
+    def _search(self, params: dict, concurrent: bool,
+                progress: Optional[ProgressCallback],
+                client: Optional[YelpAPIClient] = None) -> Iterable[Dict]:
+        """Run the search strategy for iter_search on client (default: ours), without enrichment."""
+        client = client or self.yelp_client
+        if params['max_results'] > MAX_RESULTS:
+            # A single search stops at Yelp's offset ceiling, so tile the area instead
+            return TiledSearch(client).search_location(
+                location=params['location'],
+                business_type=params['business_type'],
+                radius=params['radius'],
+                max_results=params['max_results']
+            )
+        if params['business_type'] and params.get('include_subcategories'):
+            # Fan the parent out into batches of child categories
+            return CategorySearch(client).iter_businesses(
+                location=params['location'],
+                category=params['business_type'],
+                radius=params['radius'],
+                max_results=params['max_results'],
+                concurrent=concurrent,
+                progress=progress
+            )
+        
+        # Stream pages straight into the workbook as they arrive
+        return client.iter_businesses(
+            location=params['location'],
+            business_type=params['business_type'],
+            radius=params['radius'],
+            max_results=params['max_results'],
+            concurrent=concurrent,
+            progress=progress
+        )
+    
+    def exporter_for(self, params: dict) -> Exporter:
+        """
+        Exporter for the requested output format.
+        
+        Args:
+            params: Dictionary containing output_format and, optionally, enrich
+            
+        Returns:
+            Exporter whose columns include ENRICHED_COLUMNS when enrich is set
+        """
+        excel_generator = self.excel_generator
+        if params.get('enrich'):
+            excel_generator = ExcelGenerator(excel_generator.columns + ENRICHED_COLUMNS)
+        return get_exporter(params.get('output_format', 'xlsx'), excel_generator)
+    
     def search_and_export(self, params: dict) -> str:
         """
-        Search for businesses and export to Excel.
+        Search for businesses and export them.
         
         Args:
             params: Dictionary containing search parameters
             
         Returns:
-            Path to the created Excel file
+            Path to the created file
         """
         print(f"\n🔍 Searching for businesses in {params['location']}...")
         
@@ -148,32 +230,80 @@ class MailingListGenerator:
         print(f"📊 Max results: {params['max_results']}")
         print("-" * 50)
         
+        if params['max_results'] > MAX_RESULTS:
+            print(f"🧩 More than {MAX_RESULTS} results requested. Using tiled search...")
+        elif params['business_type'] and params.get('include_subcategories'):
+            print("🌳 Including subcategories...")
+        if params.get('enrich'):
+            print("📇 Fetching business details...")
+        
         # Search for businesses
-        businesses = self.yelp_client.search_businesses(
-            location=params['location'],
-            business_type=params['business_type'],
-            radius=params['radius'],
-            max_results=params['max_results']
+        businesses = self.iter_search(params)
+        
+        # Export, streaming rows to the file as they arrive
+        exporter = self.exporter_for(params)
+        print(f"\n📊 Exporting to {exporter.name}...")
+        filepath = exporter.export(
+            businesses=businesses,
+            filename=params['filename']
         )
         
-        if not businesses:
+        if not filepath:
             print("❌ No businesses found matching your criteria.")
             return ""
         
-        print(f"✅ Found {len(businesses)} businesses!")
+        return filepath
+    
+    def refresh_and_export(self, params: dict,
+                           store: Optional[BusinessStore] = None,
+                           concurrent: bool = True) -> Tuple[RefreshDelta, Dict[str, str]]:
+        """
+        Search again and export only what changed since the last run of the same search.
+        
+        New, changed and closed businesses each go to their own file, named
+        after the output filename with a _new, _changed or _closed suffix.
+        The stored list is only updated once every file has been written,
+        so if enrichment or an export fails the next run reports the same
+        changes again.
         
-        # Export to Excel
-        print("\n📊 Exporting to Excel...")
-        filepath = self.excel_generator.export_to_excel(
-            businesses=businesses,
-            filename=params['filename']
+        Args:
+            params: Dictionary containing search parameters
+            store: Store of previously seen businesses (defaults to the shared one)
+            concurrent: Fetch result pages in parallel
+            
+        Returns:
+            Tuple of (the delta, paths of the files written keyed by change type)
+        """
+        store = store or get_business_store()
+        # Compare against Yelp's current data, not pages or details still in the cache
+        client = self.yelp_client.fresh()
+        delta = store.compare(
+            BusinessStore.list_key(params),
+            self._search(params, concurrent, None, client=client),
+            verify=lambda business_id: client.get_business_details(business_id, raise_not_found=True)
         )
         
-        # Create summary sheet
-        print("📈 Creating summary sheet...")
-        self.excel_generator.create_summary_sheet(businesses, filepath)
+        # Only the businesses being exported need their details
+        if params.get('enrich'):
+            enricher = BusinessEnricher(self.yelp_client)
+            delta.new = enricher.enrich(delta.new)
+            delta.changed = enricher.enrich(delta.changed)
         
-        return filepath
+        exporter = self.exporter_for(params)
+        if params.get('filename'):
+            base = os.path.splitext(params['filename'])[0]
+        else:
+            base = f"business_mailing_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        paths = {}
+        for change in CHANGE_TYPES:
+            businesses = getattr(delta, change)
+            if businesses:
+                paths[change] = exporter.export(businesses, f"{base}_{change}")
+        
+        # Only now that every file is written does this run become the one to compare against
+        store.commit(delta)
+        return delta, paths
     
     def run(self):
         """Run the main application."""
@@ -181,6 +311,20 @@ class MailingListGenerator:
             # Get user input
             params = self.get_user_input()
             
+            if params.get('incremental'):
+                print(f"\n🔁 Refreshing the list for {params['location']}...")
+                delta, paths = self.refresh_and_export(params)
+                counts = delta.to_dict()
+                if delta.first_run:
+                    print("🆕 First run of this search; every business is new.")
+                print(f"\n📈 {counts['new']} new, {counts['changed']} changed, "
+                      f"{counts['closed']} closed, {counts['unchanged']} unchanged")
+                for change, path in paths.items():
+                    print(f"📁 {change.capitalize()}: {os.path.abspath(path)}")
+                if not paths:
+                    print("✅ Nothing has changed since the last run.")
+                return
+            
             # Search and export
             filepath = self.search_and_export(params)
             
@@ -193,7 +337,7 @@ class MailingListGenerator:
                     print(f"\n📋 Sample of exported data:")
                     print("-" * 50)
                     # This would show sample data, but we'll keep it simple for now
-                    print("Open the Excel file to view the complete mailing list.")
+                    print("Open the output file to view the complete mailing list.")
             else:
                 print("\n❌ Failed to create mailing list.")
                 
@@ -205,7 +349,13 @@ class MailingListGenerator:
 
 def main():
     """Main entry point."""
-    generator = MailingListGenerator()
+    try:
+        generator = MailingListGenerator()
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        print("Please make sure your YELP_API_KEY is set in the .env file")
+        sys.exit(1)
+    print("✅ Yelp API client initialized successfully")
     generator.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from config import PROGRESS_MAX_EVENTS, PROGRESS_ROW_INTERVAL
+
+# Hook signature used by YelpAPIClient, ExcelGenerator and the exporters:
+# progress(event_name, **details)
+ProgressCallback = Callable[..., None]
+
+class ProgressReporter:
+    """
+    Thread-safe event log for one long-running job.
+
+    The reporter is itself the progress callback handed to the search and
+    export hooks. Each event is numbered and kept (up to max_events) so
+    readers such as the Server-Sent Events endpoint can follow along or
+    resume after reconnecting, and running totals are kept for status
+    polling.
+
+    Events:
+        stage: {'stage'} - searching, exporting, finished or failed
+        page: {'offset', 'count'} - one search page arrived
+        rate_limit_wait: {'seconds', 'reason'} - throttled or backing off after HTTP 429
+        export_rows: {'rows'} - rows written to the output file so far
+    """
+
+    def __init__(self, max_events: int = PROGRESS_MAX_EVENTS):
+        """
+        Initialize an empty event log.
+
+        Args:
+            max_events: Oldest events are dropped past this many
+        """
+        self._events = deque(maxlen=max_events)
+        self._seq = 0
+        self._condition = threading.Condition()
+        self.closed = False
+        self.totals = {
+            'stage': 'queued',
+            'pages': 0,
+            'businesses': 0,
+            'rate_limit_waits': 0,
+            'rate_limit_wait_seconds': 0.0,
+            'rows_written': 0
+        }
+
+    def __call__(self, event: str, **details) -> None:
+        self.emit(event, **details)
+
+    def emit(self, event: str, **details) -> None:
+        """
+        Record an event and wake any readers.
+
+        Args:
+            event: Event name
+            **details: JSON-serializable event data
+        """
+        with self._condition:
+            if self.closed:
+                return
+            self._update_totals(event, details)
+            self._seq += 1
+            self._events.append({
+                'id': self._seq,
+                'event': event,
+                'time': time.time(),
+                'data': dict(details, totals=dict(self.totals))
+            })
+            self._condition.notify_all()
+
+    def _update_totals(self, event: str, details: Dict) -> None:
+        totals = self.totals
+        if event == 'stage':
+            totals['stage'] = details.get('stage', totals['stage'])
+        elif event == 'page':
+            totals['pages'] += 1
+            totals['businesses'] += details.get('count', 0)
+        elif event == 'rate_limit_wait':
+            totals['rate_limit_waits'] += 1
+            totals['rate_limit_wait_seconds'] = round(
+                totals['rate_limit_wait_seconds'] + details.get('seconds', 0.0), 3)
+        elif event == 'export_rows':
+            totals['rows_written'] = details.get('rows', totals['rows_written'])
+
+    def close(self, stage: Optional[str] = None) -> None:
+        """
+        Record a final stage and stop accepting events.
+
+        Args:
+            stage: Final stage name, e.g. 'finished' or 'failed'
+        """
+        if stage:
+            self.emit('stage', stage=stage)
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def events_after(self, last_id: int = 0, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Events newer than last_id, waiting up to timeout for one to arrive.
+
+        Args:
+            last_id: Id of the last event the reader has seen
+            timeout: Seconds to wait when there is nothing new (None waits indefinitely)
+
+        Returns:
+            Newer events in order; empty on timeout or once closed
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > last_id or self.closed, timeout)
+            return [event for event in self._events if event['id'] > last_id]
+
+def report_rows(rows: Iterable, progress: Optional[ProgressCallback],
+                interval: int = PROGRESS_ROW_INTERVAL) -> Iterator:
+    """
+    Pass rows through unchanged, reporting an export_rows event every interval rows.
+
+    Args:
+        rows: Rows being written
+        progress: Progress callback (optional)
+        interval: Rows between events
+
+    Yields:
+        The rows from the input iterable
+    """
+    if progress is None:
+        yield from rows
+        return
+
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % interval == 0:
+            progress('export_rows', rows=count)
+    progress('export_rows', rows=count)
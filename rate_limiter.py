@@ -0,0 +1,195 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+from shared_instance import SharedInstance
+from config import (YELP_REQUESTS_PER_SECOND, YELP_DAILY_BUDGET,
+                    RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_BASE_BACKOFF,
+                    RATE_LIMIT_MAX_BACKOFF)
+
+class DailyBudgetExceeded(RuntimeError):
+    """Raised when the daily request budget has been used up."""
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter shared by every Yelp client in the process.
+
+    Callers reserve a token under a lock and then wait outside it, so the
+    same limiter can be used from threads (acquire) and from asyncio tasks
+    (acquire_async) without either blocking the other.
+    """
+
+    def __init__(self,
+                 requests_per_second: float = YELP_REQUESTS_PER_SECOND,
+                 burst: Optional[int] = None,
+                 daily_budget: int = YELP_DAILY_BUDGET,
+                 max_retries: int = RATE_LIMIT_MAX_RETRIES,
+                 base_backoff: float = RATE_LIMIT_BASE_BACKOFF,
+                 max_backoff: float = RATE_LIMIT_MAX_BACKOFF):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_second: Sustained request rate
+            burst: Bucket capacity (defaults to one second's worth of requests)
+            daily_budget: Maximum requests per UTC day
+            max_retries: Rate-limited retries allowed per request
+            base_backoff: Initial backoff in seconds when no Retry-After is given
+            max_backoff: Upper bound for a single backoff
+        """
+        self.rate = float(requests_per_second)
+        self.capacity = float(burst or max(1, int(requests_per_second)))
+        self.daily_budget = daily_budget
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._day = self._today()
+        self._daily_used = 0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+    @property
+    def daily_remaining(self) -> int:
+        """Requests left in today's budget."""
+        with self._lock:
+            self._roll_day()
+            return max(0, self.daily_budget - self._daily_used)
+
+    def _roll_day(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._daily_used = 0
+
+    def _reserve(self) -> float:
+        """
+        Take one token and count it against the daily budget.
+
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            self._roll_day()
+            if self._daily_used >= self.daily_budget:
+                raise DailyBudgetExceeded(
+                    f"Daily budget of {self.daily_budget} requests used up")
+
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            # Tokens may go negative: later callers queue up behind earlier ones
+            self._tokens -= 1
+            self._daily_used += 1
+
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self) -> float:
+        """
+        Block the calling thread until a request may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """
+        Suspend the calling task until a request may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Sync the daily budget with Yelp's RateLimit-* response headers.
+
+        Args:
+            headers: Response headers from any Yelp API call
+        """
+        limit = _parse_int(headers.get('RateLimit-DailyLimit'))
+        remaining = _parse_int(headers.get('RateLimit-Remaining'))
+        if limit is None and remaining is None:
+            return
+
+        with self._lock:
+            self._roll_day()
+            if limit is not None:
+                self.daily_budget = limit
+            if remaining is not None:
+                self._daily_used = max(0, self.daily_budget - remaining)
+
+    def backoff(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """
+        Register a 429 response and work out how long to back off.
+
+        Honours Retry-After when present, otherwise uses exponential
+        backoff with full jitter. The pause applies to every caller sharing
+        this limiter, not just the one that was rejected.
+
+        Args:
+            attempt: Zero-based retry attempt for the rejected request
+            headers: Headers from the 429 response
+
+        Returns:
+            Seconds until the next attempt, or None once retries are exhausted
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        delay = _parse_retry_after(headers.get('Retry-After')) if headers else None
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        return delay
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+# Process-wide limiter shared by every client that doesn't bring its own
+_shared_rate_limiter = SharedInstance(RateLimiter)
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter, creating it on first use."""
+    return _shared_rate_limiter.get()
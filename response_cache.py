@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from shared_instance import SharedInstance
+from config import (RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTLS,
+                    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_ENABLED)
+
+# Query parameters Yelp matches without regard to case
+CASE_INSENSITIVE_PARAMS = {'location', 'categories'}
+
+# Default for clients' cache argument, so cache=None can mean "no cache"
+USE_SHARED_CACHE = object()
+
+class ResponseCache:
+    """
+    Persistent SQLite cache for Yelp API responses.
+
+    Entries are keyed on the endpoint path plus normalized query parameters,
+    expire after a per-endpoint TTL, and the least recently used entries are
+    evicted once the cache grows past max_entries.
+    """
+
+    def __init__(self,
+                 path: str = RESPONSE_CACHE_PATH,
+                 ttls: Optional[Dict[str, int]] = None,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file location (':memory:' for a process-local cache)
+            ttls: Seconds to keep entries, keyed by endpoint ('search', 'details')
+            max_entries: Entry count above which LRU eviction kicks in
+        """
+        self.path = path
+        self.ttls = dict(RESPONSE_CACHE_TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)')
+
+    @staticmethod
+    def endpoint_for(path: str) -> str:
+        """Map an API path to the endpoint name used for TTL lookup."""
+        return 'search' if path.endswith('/search') else 'details'
+
+    @staticmethod
+    def make_key(path: str, params: Optional[Dict] = None) -> str:
+        """
+        Build a cache key from a URL or path and its query parameters.
+
+        Parameters are normalized so equivalent requests share an entry:
+        strings are trimmed, locations and categories are lower-cased,
+        category lists are sorted, and empty values are dropped.
+        """
+        normalized = {}
+        for name, value in (params or {}).items():
+            if value is None or value == '':
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+                if name in CASE_INSENSITIVE_PARAMS:
+                    value = ' '.join(value.lower().split())
+                if name == 'categories':
+                    value = ','.join(sorted(v.strip() for v in value.split(',') if v.strip()))
+            normalized[name] = value
+
+        raw = json.dumps({'path': path, 'params': normalized}, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, path: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Look up a cached response.
+
+        Args:
+            path: Request URL, or endpoint path
+            params: Query parameters
+
+        Returns:
+            Cached response body or None on a miss or expired entry
+        """
+        key = self.make_key(path, params)
+        now = time.time()
+        ttl = self.ttls.get(self.endpoint_for(path), 0)
+
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT body, created_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > ttl:
+                if row is not None:
+                    self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.misses += 1
+                return None
+
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, path: str, params: Optional[Dict], data: Dict) -> None:
+        """
+        Store a response and evict least recently used entries if over capacity.
+
+        Args:
+            path: Request URL, or endpoint path
+            params: Query parameters
+            data: Decoded response body
+        """
+        key = self.make_key(path, params)
+        now = time.time()
+        body = json.dumps(data, separators=(',', ':'))
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, endpoint, body, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, self.endpoint_for(path), body, now, now)
+            )
+            count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    'DELETE FROM responses WHERE key IN '
+                    '(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)',
+                    (count - self.max_entries,)
+                )
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current entry count."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries
+        }
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+# Process-wide cache shared by every client that doesn't bring its own
+_shared_cache = SharedInstance(ResponseCache)
+
+def get_shared_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None if caching is disabled."""
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    return _shared_cache.get()
@@ -0,0 +1,42 @@
+import os
+import threading
+from typing import Any, Callable, Optional
+
+class SharedInstance:
+    """
+    Process-wide instance created on first use.
+
+    The factory runs once, under a lock, however many threads ask for the
+    instance at the same time. With per_process set,
+    a forked child builds its own instance instead of inheriting the
+    parent's, for objects such as SQLite connections that can't cross a fork.
+    """
+
+    def __init__(self, factory: Callable[[], Any], per_process: bool = False):
+        """
+        Args:
+            factory: Builds the instance
+            per_process: Build a fresh instance in each forked process
+        """
+        self._factory = factory
+        self._per_process = per_process
+        self._instance = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _stale(self) -> bool:
+        return self._instance is None or (self._per_process and self._pid != os.getpid())
+
+    def get(self) -> Any:
+        """Return the instance, creating it on first use."""
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self._instance = self._factory()
+                    self._pid = os.getpid()
+        return self._instance
+
+    @property
+    def current(self) -> Optional[Any]:
+        """The instance if it has been created, without creating it."""
+        return self._instance
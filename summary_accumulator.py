@@ -0,0 +1,130 @@
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List
+
+class SummaryAccumulator:
+    """
+    Collects mailing list statistics in a single pass over businesses.
+
+    Businesses can be added one at a time as they stream past, and
+    accumulators built over separate batches can be merged.
+    """
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.total = 0
+        self.rating_sum = 0.0
+        self.with_phone = 0
+        self.with_website = 0
+        self.business_types = Counter()
+        self.cities = Counter()
+        self.rating_histogram = Counter()
+        self.price_levels = Counter()
+        self.zip_codes = Counter()
+
+    def add(self, business: Dict) -> None:
+        """
+        Fold one business into the statistics.
+
+        Args:
+            business: Business dictionary from Yelp API
+        """
+        self.total += 1
+
+        rating = business.get('rating')
+        if rating:
+            self.rating_sum += rating
+            self.rating_histogram[f"{float(rating):.1f}"] += 1
+
+        if business.get('phone'):
+            self.with_phone += 1
+        if business.get('url'):
+            self.with_website += 1
+
+        for category in business.get('categories', []):
+            self.business_types[category.get('title', '')] += 1
+
+        location = business.get('location', {})
+        self.cities[location.get('city', 'Unknown')] += 1
+        self.zip_codes[location.get('zip_code') or 'Unknown'] += 1
+
+        self.price_levels[business.get('price') or 'Unknown'] += 1
+
+    def add_many(self, businesses: Iterable[Dict]) -> 'SummaryAccumulator':
+        """Fold every business from an iterable into the statistics."""
+        for business in businesses:
+            self.add(business)
+        return self
+
+    def track(self, businesses: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Pass businesses through unchanged while counting them.
+
+        Lets statistics be gathered on the same pass that formats or writes
+        the rows.
+
+        Yields:
+            The businesses from the input iterable
+        """
+        for business in businesses:
+            self.add(business)
+            yield business
+
+    def merge(self, other: 'SummaryAccumulator') -> 'SummaryAccumulator':
+        """
+        Combine another accumulator's statistics into this one.
+
+        Args:
+            other: Accumulator built over a different batch of businesses
+
+        Returns:
+            This accumulator
+        """
+        self.total += other.total
+        self.rating_sum += other.rating_sum
+        self.with_phone += other.with_phone
+        self.with_website += other.with_website
+        self.business_types.update(other.business_types)
+        self.cities.update(other.cities)
+        self.rating_histogram.update(other.rating_histogram)
+        self.price_levels.update(other.price_levels)
+        self.zip_codes.update(other.zip_codes)
+        return self
+
+    @property
+    def average_rating(self) -> float:
+        """Mean rating, counting unrated businesses as zero."""
+        return self.rating_sum / self.total if self.total else 0.0
+
+    def summary_data(self) -> Dict[str, List]:
+        """
+        Build the Metric/Value columns for the summary sheet.
+
+        Returns:
+            Dictionary with 'Metric' and 'Value' lists
+        """
+        metrics = [
+            ('Total Businesses', self.total),
+            ('Average Rating', f"{self.average_rating:.1f}"),
+            ('Businesses with Phone', self.with_phone),
+            ('Businesses with Website', self.with_website),
+            ('Top Business Type', _top(self.business_types)),
+            ('Top City', _top(self.cities))
+        ]
+
+        for rating, count in sorted(self.rating_histogram.items(), key=lambda x: float(x[0]), reverse=True):
+            metrics.append((f"Rated {rating}", count))
+
+        for price, count in sorted(self.price_levels.items(), key=lambda x: (x[0] == 'Unknown', len(x[0]))):
+            metrics.append((f"Price {price}", count))
+
+        for zip_code, count in self.zip_codes.most_common():
+            metrics.append((f"ZIP {zip_code}", count))
+
+        return {
+            'Metric': [metric for metric, _ in metrics],
+            'Value': [value for _, value in metrics]
+        }
+
+def _top(counter: Counter) -> str:
+    """Most common key in a counter, or 'N/A' if it is empty."""
+    return counter.most_common(1)[0][0] if counter else 'N/A'
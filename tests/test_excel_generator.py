@@ -0,0 +1,77 @@
+"""
+Tests that ExcelGenerator.format_business_frame matches the row-by-row formatter.
+
+Run with:
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_generator import ExcelGenerator
+from config import EXCEL_COLUMNS, ENRICHED_COLUMNS
+
+FULL = {
+    'id': 'full',
+    'name': 'Full Business',
+    'location': {'address1': '123 Main St', 'city': 'Nashville', 'state': 'TN', 'zip_code': '37203'},
+    'categories': [{'alias': 'pizza', 'title': 'Pizza'}, {'alias': 'bars', 'title': 'Bars'}],
+    'phone': '+1 (615) 555-0100',
+    'url': 'https://www.yelp.com/biz/full',
+    'rating': 4.5,
+    'review_count': 120,
+    'price': '$$'
+}
+
+def assert_same_output(generator: ExcelGenerator, businesses: list) -> None:
+    """Both formatters give the same DataFrame for these businesses."""
+    rows = pd.DataFrame(generator.format_business_data(businesses), columns=generator.columns)
+    frame = generator.format_business_frame(businesses)
+    pd.testing.assert_frame_equal(rows, frame)
+
+def test_full_business():
+    assert_same_output(ExcelGenerator(), [FULL])
+
+def test_missing_fields():
+    assert_same_output(ExcelGenerator(), [FULL, {'id': 'bare'}, {'id': 'no-location', 'name': 'X', 'location': {}}])
+
+def test_none_values():
+    business = {
+        'id': 'nones',
+        'name': None,
+        'location': {'address1': None, 'city': None, 'state': 'TN', 'zip_code': None},
+        'categories': None,
+        'phone': None,
+        'url': None,
+        'rating': None,
+        'review_count': None,
+        'price': None
+    }
+    assert_same_output(ExcelGenerator(), [FULL, business])
+
+def test_numeric_zip_and_counts():
+    business = dict(FULL, id='numeric', location=dict(FULL['location'], zip_code=37203), review_count=0)
+    assert_same_output(ExcelGenerator(), [business, FULL])
+
+@pytest.mark.parametrize('price', ['', '$', '$$$$'])
+def test_price_levels(price):
+    assert_same_output(ExcelGenerator(), [dict(FULL, price=price)])
+
+def test_enriched_columns():
+    enriched = dict(FULL,
+                    hours=[{'hours_type': 'REGULAR', 'open': [{'day': 0, 'start': '0900', 'end': '1700'}]}],
+                    photos=['https://example.com/a.jpg', 'https://example.com/b.jpg'],
+                    is_claimed=False)
+    generator = ExcelGenerator(EXCEL_COLUMNS + ENRICHED_COLUMNS)
+    assert_same_output(generator, [enriched, FULL])
+
+def test_empty_input():
+    generator = ExcelGenerator()
+    frame = generator.format_business_frame([])
+    assert list(frame.columns) == generator.columns
+    assert frame.empty
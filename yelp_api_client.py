@@ -1,11 +1,74 @@
 import requests
-import time
-from typing import List, Dict, Optional
-from config import YELP_API_KEY, YELP_BASE_URL, DEFAULT_LIMIT, MAX_RESULTS
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Iterator, Optional, Tuple
+from config import (YELP_API_KEY, YELP_BASE_URL, DEFAULT_LIMIT, MAX_RESULTS,
+                    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_KEEP_ALIVE,
+                    HTTP_COMPRESSION, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+                    SEARCH_MAX_WORKERS)
+from rate_limiter import RateLimiter, DailyBudgetExceeded, get_shared_rate_limiter
+from response_cache import ResponseCache, USE_SHARED_CACHE, get_shared_response_cache
+from progress import ProgressCallback
+from shared_instance import SharedInstance
+
+class BusinessNotFound(LookupError):
+    """Raised when Yelp reports that a business id doesn't exist (HTTP 404)."""
+
+def create_session(pool_connections: int = HTTP_POOL_CONNECTIONS,
+                   pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                   keep_alive: bool = HTTP_KEEP_ALIVE,
+                   compression: bool = HTTP_COMPRESSION) -> requests.Session:
+    """
+    Create a requests session backed by a pooled, keep-alive connection adapter.
+    
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum connections kept open per host
+        keep_alive: Reuse connections between requests
+        compression: Ask the server for gzip/deflate encoded responses
+        
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize,
+                          pool_block=False)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    session.headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+    session.headers['Accept-Encoding'] = 'gzip, deflate' if compression else 'identity'
+    return session
+
+# Process-wide session shared by every client that doesn't bring its own
+_shared_session = SharedInstance(create_session)
+
+def get_shared_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    return _shared_session.get()
 
 class YelpAPIClient:
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize Yelp API client with API key."""
+    def __init__(self, api_key: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = USE_SHARED_CACHE,
+                 base_url: Optional[str] = None,
+                 timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 refresh_cache: bool = False):
+        """
+        Initialize Yelp API client with API key.
+        
+        Args:
+            api_key: Yelp API key (defaults to YELP_API_KEY)
+            session: HTTP session to use (defaults to the shared pooled session)
+            rate_limiter: Rate limiter to use (defaults to the shared limiter)
+            cache: Response cache to use (defaults to the shared cache, if enabled;
+                None disables caching)
+            base_url: API root URL (defaults to YELP_BASE_URL)
+            timeout: (connect, read) timeouts in seconds for each request
+            refresh_cache: Always fetch fresh responses, still storing them in the cache
+        """
         self.api_key = api_key or YELP_API_KEY
         if not self.api_key:
             raise ValueError("Yelp API key is required. Set YELP_API_KEY environment variable.")
@@ -14,13 +77,106 @@ class YelpAPIClient:
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
+        self.session = session or get_shared_session()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.cache = get_shared_response_cache() if cache is USE_SHARED_CACHE else cache
+        self.base_url = (base_url or YELP_BASE_URL).rstrip('/')
+        self.timeout = timeout
+        self.refresh_cache = refresh_cache
+    
+    def fresh(self) -> 'YelpAPIClient':
+        """
+        A client sharing this one's session, rate limiter and cache that
+        skips cached responses, for runs that must see Yelp's current data.
+        """
+        return YelpAPIClient(api_key=self.api_key,
+                             session=self.session,
+                             rate_limiter=self.rate_limiter,
+                             cache=self.cache,
+                             base_url=self.base_url,
+                             timeout=self.timeout,
+                             refresh_cache=True)
+    
+    def close(self) -> None:
+        """Close the client's session if it isn't the shared one."""
+        if self.session is not _shared_session.current:
+            self.session.close()
+    
+    def _get(self,
+             path: str,
+             params: Optional[Dict] = None,
+             progress: Optional[ProgressCallback] = None,
+             raise_not_found: bool = False) -> Optional[Dict]:
+        """
+        Issue a rate-limited GET against the Yelp API.
+        
+        Args:
+            path: Endpoint path relative to the base URL
+            params: Query parameters
+            progress: Callback told about rate-limit waits (optional)
+            raise_not_found: Raise BusinessNotFound on a 404 instead of returning None
+            
+        Returns:
+            Decoded response body or None if the request failed
+        """
+        # Cache by full URL so responses from different servers never mix
+        url = f'{self.base_url}{path}'
+        if self.cache is not None and not self.refresh_cache:
+            cached = self.cache.get(url, params)
+            if cached is not None:
+                return cached
+        
+        attempt = 0
+        while True:
+            try:
+                waited = self.rate_limiter.acquire()
+                if progress is not None and (waited > 0 or attempt):
+                    # Waits after a 429 are the backoff the limiter just imposed
+                    progress('rate_limit_wait', seconds=round(waited, 3),
+                             reason='429' if attempt else 'throttle')
+                response = self.session.get(
+                    url,
+                    headers=self.headers,
+                    params=params,
+                    timeout=self.timeout
+                )
+                self.rate_limiter.update_from_headers(response.headers)
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    if self.cache is not None:
+                        self.cache.set(url, params, data)
+                    return data
+                elif response.status_code == 429:
+                    delay = self.rate_limiter.backoff(attempt, response.headers)
+                    if delay is None:
+                        print("Rate limit exceeded. Giving up after retries.")
+                        return None
+                    print(f"Rate limit exceeded. Retrying in {delay:.1f}s...")
+                    attempt += 1
+                    continue
+                elif response.status_code == 404 and raise_not_found:
+                    raise BusinessNotFound(path)
+                else:
+                    print(f"API Error: {response.status_code} - {response.text}")
+                    return None
+                    
+            except DailyBudgetExceeded as e:
+                print(f"Rate limit error: {e}")
+                return None
+            except requests.exceptions.RequestException as e:
+                print(f"Request error: {e}")
+                return None
     
     def search_businesses(self, 
                          location: str,
                          business_type: Optional[str] = None,
                          radius: int = 40000,  # 40km radius
                          limit: int = DEFAULT_LIMIT,
-                         max_results: int = MAX_RESULTS) -> List[Dict]:
+                         max_results: int = MAX_RESULTS,
+                         concurrent: bool = False,
+                         max_workers: int = SEARCH_MAX_WORKERS,
+                         progress: Optional[ProgressCallback] = None) -> List[Dict]:
         """
         Search for businesses using Yelp API.
         
@@ -30,85 +186,183 @@ class YelpAPIClient:
             radius: Search radius in meters
             limit: Number of results per request
             max_results: Maximum total results to collect
+            concurrent: Fetch the remaining pages in parallel once the first
+                page reports the total
+            max_workers: Maximum pages in flight when concurrent is True
+            progress: Callback told about each page and rate-limit wait
+                (optional), e.g. a progress.ProgressReporter
             
         Returns:
             List of business dictionaries
         """
-        businesses = []
+        return list(self.iter_businesses(location, business_type, radius, limit,
+                                         max_results, concurrent, max_workers, progress))
+    
+    def iter_businesses(self,
+                        location: str,
+                        business_type: Optional[str] = None,
+                        radius: int = 40000,
+                        limit: int = DEFAULT_LIMIT,
+                        max_results: int = MAX_RESULTS,
+                        concurrent: bool = False,
+                        max_workers: int = SEARCH_MAX_WORKERS,
+                        progress: Optional[ProgressCallback] = None) -> Iterator[Dict]:
+        """
+        Stream search results one business at a time as pages arrive.
+        
+        Takes the same arguments as search_businesses.
+        
+        Yields:
+            Business dictionaries in offset order
+        """
+        for page in self.iter_pages(location, business_type, radius, limit,
+                                    max_results, concurrent, max_workers, progress):
+            yield from page
+    
+    def iter_pages(self,
+                   location: str,
+                   business_type: Optional[str] = None,
+                   radius: int = 40000,
+                   limit: int = DEFAULT_LIMIT,
+                   max_results: int = MAX_RESULTS,
+                   concurrent: bool = False,
+                   max_workers: int = SEARCH_MAX_WORKERS,
+                   progress: Optional[ProgressCallback] = None) -> Iterator[List[Dict]]:
+        """
+        Stream search results page by page as they arrive.
+        
+        Takes the same arguments as search_businesses. A failed or empty
+        page ends the stream.
+        
+        Yields:
+            Lists of business dictionaries in offset order
+        """
+        base_params = {
+            'location': location,
+            'radius': radius
+        }
+        
+        # Add category filter if specified
+        if business_type:
+            base_params['categories'] = business_type
+        
+        if concurrent:
+            pages = self._iter_pages_concurrent(base_params, limit, max_results, max_workers, progress)
+        else:
+            pages = self._iter_pages_sequential(base_params, limit, max_results, progress)
+        
+        offset = 0
+        for page in pages:
+            if progress is not None:
+                progress('page', offset=offset, count=len(page))
+            offset += len(page)
+            yield page
+    
+    def _iter_pages_sequential(self,
+                               base_params: Dict,
+                               limit: int,
+                               max_results: int,
+                               progress: Optional[ProgressCallback] = None) -> Iterator[List[Dict]]:
+        """Fetch pages one after another until a page comes back empty."""
+        collected = 0
         offset = 0
         
-        while len(businesses) < max_results:
+        while collected < max_results:
             # Prepare search parameters
-            params = {
-                'location': location,
-                'radius': radius,
-                'limit': min(limit, max_results - len(businesses)),
-                'offset': offset
-            }
+            params = dict(base_params,
+                          limit=min(limit, max_results - collected),
+                          offset=offset)
             
-            # Add category filter if specified
-            if business_type:
-                params['categories'] = business_type
+            data = self._get('/businesses/search', params, progress)
+            if data is None:
+                return
             
-            try:
-                response = requests.get(
-                    f'{YELP_BASE_URL}/businesses/search',
-                    headers=self.headers,
-                    params=params
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    new_businesses = data.get('businesses', [])
-                    
-                    if not new_businesses:
-                        break  # No more results
-                    
-                    businesses.extend(new_businesses)
-                    offset += len(new_businesses)
-                    
-                    # Rate limiting - Yelp allows 5000 requests per day
-                    time.sleep(0.1)
-                    
-                elif response.status_code == 429:
-                    print("Rate limit exceeded. Waiting before retrying...")
-                    time.sleep(60)  # Wait 1 minute
-                    continue
-                else:
-                    print(f"API Error: {response.status_code} - {response.text}")
-                    break
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"Request error: {e}")
-                break
+            new_businesses = data.get('businesses', [])
+            if not new_businesses:
+                return  # No more results
+            
+            offset += len(new_businesses)
+            new_businesses = new_businesses[:max_results - collected]
+            collected += len(new_businesses)
+            yield new_businesses
+    
+    def _iter_pages_concurrent(self,
+                               base_params: Dict,
+                               limit: int,
+                               max_results: int,
+                               max_workers: int,
+                               progress: Optional[ProgressCallback] = None) -> Iterator[List[Dict]]:
+        """
+        Fetch the first page, then the remaining offsets in parallel.
+        
+        Pages are yielded in offset order as soon as each one and all pages
+        before it have arrived.
+        """
+        first_page = self._get('/businesses/search', 
+            dict(base_params, limit=min(limit, max_results), offset=0),
+            progress
+        )
+        businesses = (first_page or {}).get('businesses', [])[:max_results]
+        if not businesses:
+            return
+        yield businesses
+        
+        # Yelp rejects offset + limit beyond its result ceiling
+        target = min(first_page.get('total', len(businesses)), max_results, MAX_RESULTS)
+        offsets = range(len(businesses), target, limit)
+        if not offsets:
+            return
         
-        return businesses[:max_results]
+        def fetch(offset: int) -> Optional[Dict]:
+            params = dict(base_params, limit=min(limit, target - offset), offset=offset)
+            return self._get('/businesses/search', params, progress)
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        try:
+            futures = [executor.submit(fetch, offset) for offset in offsets]
+            for future in futures:
+                page = future.result()
+                new_businesses = page.get('businesses', []) if page else []
+                if not new_businesses:
+                    return
+                yield new_businesses
+        finally:
+            # Don't keep fetching pages nobody will read
+            executor.shutdown(wait=False, cancel_futures=True)
     
-    def get_business_details(self, business_id: str) -> Optional[Dict]:
+    def locate(self, location: str) -> Optional[Tuple[float, float]]:
+        """
+        Resolve a location string to the center point Yelp searches around.
+        
+        Args:
+            location: City, state, or ZIP code
+            
+        Returns:
+            (latitude, longitude) tuple or None if Yelp couldn't resolve it
+        """
+        data = self._get('/businesses/search', {'location': location, 'limit': 1})
+        center = (data or {}).get('region', {}).get('center')
+        if not center:
+            return None
+        return center['latitude'], center['longitude']
+    
+    def get_business_details(self, business_id: str,
+                             progress: Optional[ProgressCallback] = None,
+                             raise_not_found: bool = False) -> Optional[Dict]:
         """
         Get detailed information for a specific business.
         
         Args:
             business_id: Yelp business ID
+            progress: Callback told about rate-limit waits (optional)
+            raise_not_found: Raise BusinessNotFound when Yelp has no such
+                business, so it can be told apart from a failed request
             
         Returns:
             Business details dictionary or None if error
         """
-        try:
-            response = requests.get(
-                f'{YELP_BASE_URL}/businesses/{business_id}',
-                headers=self.headers
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"Error getting business details: {response.status_code}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            return None
+        return self._get(f'/businesses/{business_id}', progress=progress,
+                         raise_not_found=raise_not_found)
     
     def search_by_coordinates(self, 
                             latitude: float,
@@ -129,6 +383,30 @@ class YelpAPIClient:
         Returns:
             List of business dictionaries
         """
+        data = self.search_by_coordinates_page(latitude, longitude, business_type, radius, limit)
+        return data.get('businesses', []) if data else []
+    
+    def search_by_coordinates_page(self,
+                                   latitude: float,
+                                   longitude: float,
+                                   business_type: Optional[str] = None,
+                                   radius: int = 40000,
+                                   limit: int = DEFAULT_LIMIT,
+                                   offset: int = 0) -> Optional[Dict]:
+        """
+        Fetch one raw page of a coordinate search, including Yelp's reported total.
+        
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            business_type: Category of business to search for
+            radius: Search radius in meters
+            limit: Number of results per request
+            offset: Index of the first result to return
+            
+        Returns:
+            Response body with 'businesses' and 'total', or None if error
+        """
         params = {
             'latitude': latitude,
             'longitude': longitude,
@@ -136,23 +414,10 @@ class YelpAPIClient:
             'limit': limit
         }
         
+        if offset:
+            params['offset'] = offset
+        
         if business_type:
             params['categories'] = business_type
         
-        try:
-            response = requests.get(
-                f'{YELP_BASE_URL}/businesses/search',
-                headers=self.headers,
-                params=params
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('businesses', [])
-            else:
-                print(f"API Error: {response.status_code} - {response.text}")
-                return []
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            return [] 
\ No newline at end of file
+        return self._get('/businesses/search', params)
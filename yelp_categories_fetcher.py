@@ -2,16 +2,17 @@ import requests
 import os
 import json
 from dotenv import load_dotenv
+from config import YELP_BASE_URL, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
 
 # Load environment variables from .env file
 load_dotenv()
 
 def fetch_yelp_categories(api_key, output_file='yelp_categories.json'):
-    url = 'https://api.yelp.com/v3/categories'
+    url = f'{YELP_BASE_URL}/categories'
     headers = {
         'Authorization': f'Bearer {api_key}'
     }
-    response = requests.get(url, headers=headers)
+    response = requests.get(url, headers=headers, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
     if response.status_code == 200:
         categories = response.json().get('categories', [])
         with open(output_file, 'w') as f:
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Offline Yelp Fusion stub server
+
+Serves synthetic /businesses/search, /businesses/{id} and /categories
+responses, so the clients, exporters and benchmarks can run without an API
+key or quota. Businesses are scattered around one point with deterministic
+names, addresses and categories, and searches honour location, latitude/
+longitude, radius, categories, limit and offset, including Yelp's 1000
+result paging ceiling. Latency and a share of HTTP 429 responses can be
+injected.
+
+Usage:
+    python yelp_stub_server.py --businesses 10000 --latency 0.05 --rate-429 0.01
+    YELP_BASE_URL=http://127.0.0.1:8765/v3 YELP_API_KEY=stub python main.py
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from geo_tiling import distance_meters, EARTH_RADIUS_M
+from category_registry import get_category_registry
+from config import DEFAULT_LIMIT, MAX_RESULTS
+
+# Leaf categories handed out to synthetic businesses
+STUB_CATEGORIES = [
+    ('pizza', 'Pizza'), ('mexican', 'Mexican'), ('coffee', 'Coffee & Tea'),
+    ('grocery', 'Grocery'), ('chiropractors', 'Chiropractors'), ('autorepair', 'Auto Repair'),
+    ('hair', 'Hair Salons'), ('plumbing', 'Plumbing'), ('yoga', 'Yoga'),
+    ('realestateagents', 'Real Estate Agents'), ('accountants', 'Accountants')
+]
+STREETS = ['Main St', 'Broadway', 'Church St', 'Elm Ave', 'Oak Dr', 'Hillsboro Pike', 'Cedar Ln']
+NAME_WORDS = ['Acme', 'Blue', 'Capitol', 'Delta', 'Eagle', 'Frontier', 'Golden', 'Harbor', 'Iron', 'Juniper']
+
+class SyntheticYelp:
+    """
+    Deterministic set of businesses and the search logic over them.
+
+    Businesses are spread uniformly over a disc and filed in a grid, so a
+    radius search only measures the distance to businesses in nearby cells.
+    """
+
+    CELL_METERS = 2000
+    MAX_RADIUS = 40000
+
+    def __init__(self,
+                 businesses: int = 1000,
+                 center: Tuple[float, float] = (36.1627, -86.7816),
+                 spread: float = 35000,
+                 seed: int = 0):
+        """
+        Generate the businesses.
+
+        Args:
+            businesses: Number of businesses
+            center: (latitude, longitude) every location string resolves to
+            spread: Radius in meters of the disc the businesses are scattered over
+            seed: Random seed, so equal arguments give equal data
+        """
+        self.count = businesses
+        self.center = center
+        self.seed = seed
+
+        rng = random.Random(seed)
+        self._meters_per_degree_lat = math.pi * EARTH_RADIUS_M / 180
+        self._meters_per_degree_lon = self._meters_per_degree_lat * math.cos(math.radians(center[0]))
+        self.coordinates = []
+        self._cells = defaultdict(list)
+        for index in range(businesses):
+            distance = spread * math.sqrt(rng.random())
+            angle = rng.uniform(0, 2 * math.pi)
+            north, east = distance * math.cos(angle), distance * math.sin(angle)
+            self.coordinates.append((center[0] + north / self._meters_per_degree_lat,
+                                     center[1] + east / self._meters_per_degree_lon))
+            self._cells[self._cell(north, east)].append(index)
+
+        self._hierarchy = None
+        self._queries = OrderedDict()
+        self._queries_lock = threading.Lock()
+
+    def _cell(self, north: float, east: float) -> Tuple[int, int]:
+        return int(math.floor(north / self.CELL_METERS)), int(math.floor(east / self.CELL_METERS))
+
+    def _offset(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        """Meters north and east of the center."""
+        return ((latitude - self.center[0]) * self._meters_per_degree_lat,
+                (longitude - self.center[1]) * self._meters_per_degree_lon)
+
+    def category(self, index: int) -> Tuple[str, str]:
+        """(alias, title) of a business's category."""
+        return STUB_CATEGORIES[(index * 7 + self.seed) % len(STUB_CATEGORIES)]
+
+    def _matches(self, index: int, categories: Optional[List[str]]) -> bool:
+        """Whether a business is in, or below, one of the requested categories."""
+        if not categories:
+            return True
+        alias = self.category(index)[0]
+        if self._hierarchy is None:
+            self._hierarchy = get_category_registry().hierarchy
+        return any(alias == category or self._hierarchy.is_descendant(alias, category)
+                   for category in categories)
+
+    def search(self, latitude: float, longitude: float, radius: float,
+               categories: Optional[List[str]] = None) -> List[Tuple[float, int]]:
+        """
+        Businesses within radius of a point, nearest first.
+
+        Results are memoized, as clients page through the same search.
+
+        Returns:
+            (distance in meters, business index) pairs
+        """
+        key = (round(latitude, 6), round(longitude, 6), round(radius), tuple(categories or ()))
+        with self._queries_lock:
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key]
+
+        north, east = self._offset(latitude, longitude)
+        low = self._cell(north - radius, east - radius)
+        high = self._cell(north + radius, east + radius)
+        found = []
+        for row in range(low[0], high[0] + 1):
+            for column in range(low[1], high[1] + 1):
+                for index in self._cells.get((row, column), ()):
+                    distance = distance_meters(latitude, longitude, *self.coordinates[index])
+                    if distance <= radius and self._matches(index, categories):
+                        found.append((distance, index))
+        found.sort()
+
+        with self._queries_lock:
+            self._queries[key] = found
+            if len(self._queries) > 256:
+                self._queries.popitem(last=False)
+        return found
+
+    def business(self, index: int, distance: Optional[float] = None) -> Dict:
+        """A search-result business dictionary."""
+        alias, title = self.category(index)
+        latitude, longitude = self.coordinates[index]
+        name = f"{NAME_WORDS[index % len(NAME_WORDS)]} {title} {index}"
+        business_id = f"stub-{index:06d}"
+        address = f"{100 + index % 9900} {STREETS[index % len(STREETS)]}"
+        zip_code = str(37000 + index % 250)
+        phone = f"+1615{index % 10000000:07d}"
+        business = {
+            'id': business_id,
+            'alias': name.lower().replace(' ', '-').replace('&', 'and'),
+            'name': name,
+            'image_url': f"https://stub.example/photos/{business_id}/o.jpg",
+            'is_closed': False,
+            'url': f"https://www.yelp.com/biz/{business_id}",
+            'review_count': (index * 37) % 900,
+            'categories': [{'alias': alias, 'title': title}],
+            'rating': 1.0 + (index % 9) * 0.5,
+            'coordinates': {'latitude': latitude, 'longitude': longitude},
+            'transactions': [],
+            'price': '$' * (1 + index % 4),
+            'location': {
+                'address1': address,
+                'address2': '',
+                'address3': '',
+                'city': 'Stubville',
+                'zip_code': zip_code,
+                'country': 'US',
+                'state': 'TN',
+                'display_address': [address, f"Stubville, TN {zip_code}"]
+            },
+            'phone': phone,
+            'display_phone': f"({phone[2:5]}) {phone[5:8]}-{phone[8:]}"
+        }
+        if distance is not None:
+            business['distance'] = distance
+        return business
+
+    def details(self, business_id: str) -> Optional[Dict]:
+        """A business details dictionary, or None for an unknown id."""
+        try:
+            index = int(business_id.rsplit('-', 1)[1])
+        except (IndexError, ValueError):
+            return None
+        if not 0 <= index < self.count:
+            return None
+        business = self.business(index)
+        business.update({
+            'is_claimed': index % 3 != 0,
+            'photos': [f"https://stub.example/photos/{business['id']}/{n}.jpg" for n in range(3)],
+            'hours': [{
+                'open': [{'is_overnight': False, 'start': '0900', 'end': '1700', 'day': day}
+                         for day in range(5)],
+                'hours_type': 'REGULAR',
+                'is_open_now': True
+            }]
+        })
+        return business
+
+class StubYelpServer:
+    """
+    Threaded HTTP server speaking enough of the Yelp Fusion API for the clients.
+
+    Use it from the command line, or in-process as a context manager:
+
+        with StubYelpServer(businesses=5000, latency=0.02) as stub:
+            client = YelpAPIClient(api_key='stub', base_url=stub.url)
+    """
+
+    def __init__(self,
+                 businesses: int = 1000,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 rate_429: float = 0.0,
+                 retry_after: Optional[float] = None,
+                 daily_limit: int = 1_000_000,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 seed: int = 0):
+        """
+        Build the data set and bind the server without starting it.
+
+        Args:
+            businesses: Number of synthetic businesses
+            latency: Seconds added to every response
+            jitter: Up to this many extra seconds, added at random
+            rate_429: Share of requests in [0, 1] answered with HTTP 429
+            retry_after: Retry-After seconds sent with each 429 (optional)
+            daily_limit: Reported in the RateLimit-DailyLimit header
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            seed: Random seed for the data and injected failures
+        """
+        self.data = SyntheticYelp(businesses, seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.daily_limit = daily_limit
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self._thread = None
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Base URL to use in place of YELP_BASE_URL."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v3"
+
+    def stats(self) -> Dict[str, int]:
+        """Requests served, by endpoint and status."""
+        with self._lock:
+            return dict(self.requests)
+
+    def start(self) -> 'StubYelpServer':
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='yelp-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'StubYelpServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _count(self, name: str) -> int:
+        with self._lock:
+            self.requests[name] += 1
+            return sum(count for key, count in self.requests.items() if not key.startswith('status_'))
+
+    def handle(self, path: str, query: Dict[str, List[str]], authorized: bool) -> Tuple[int, Dict, Dict]:
+        """
+        Answer one request.
+
+        Returns:
+            Tuple of (HTTP status, response body, extra headers)
+        """
+        if path.startswith('/v3/'):
+            path = path[3:]
+        endpoint = 'search' if path == '/businesses/search' else path.split('/')[1] if '/' in path else path
+        served = self._count(endpoint)
+        headers = {
+            'RateLimit-DailyLimit': str(self.daily_limit),
+            'RateLimit-Remaining': str(max(0, self.daily_limit - served))
+        }
+
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._random.uniform(0, self.jitter)
+            time.sleep(self.latency + extra)
+
+        if not authorized:
+            return 401, _error('TOKEN_MISSING', 'An access token must be supplied.'), headers
+        with self._lock:
+            throttled = self._random.random() < self.rate_429
+        if throttled:
+            if self.retry_after is not None:
+                headers['Retry-After'] = str(self.retry_after)
+            return 429, _error('TOO_MANY_REQUESTS_PER_SECOND',
+                               'You have exceeded the queries-per-second limit for this endpoint.'), headers
+
+        if path == '/businesses/search':
+            return self._search(query) + (headers,)
+        if path == '/categories':
+            return 200, {'categories': get_category_registry().categories}, headers
+        if path.startswith('/businesses/'):
+            business = self.data.details(path[len('/businesses/'):])
+            if business is None:
+                return 404, _error('BUSINESS_NOT_FOUND', 'The requested business could not be found.'), headers
+            return 200, business, headers
+        return 404, _error('NOT_FOUND', 'Resource could not be found.'), headers
+
+    def _search(self, query: Dict[str, List[str]]) -> Tuple[int, Dict]:
+        """Answer /businesses/search the way Yelp pages and validates it."""
+        def number(name: str, default: float) -> float:
+            return float(query.get(name, [default])[0])
+
+        try:
+            limit = int(number('limit', 20))
+            offset = int(number('offset', 0))
+            radius = number('radius', SyntheticYelp.MAX_RADIUS)
+            if 'latitude' in query and 'longitude' in query:
+                latitude, longitude = number('latitude', 0), number('longitude', 0)
+            elif query.get('location', [''])[0].strip():
+                latitude, longitude = self.data.center
+            else:
+                return 400, _error('VALIDATION_ERROR', 'Please specify a location or a latitude and longitude')
+        except ValueError:
+            return 400, _error('VALIDATION_ERROR', 'Invalid numeric parameter')
+
+        if limit > DEFAULT_LIMIT or limit < 0 or offset < 0:
+            return 400, _error('VALIDATION_ERROR', f'limit must be between 0 and {DEFAULT_LIMIT}')
+        if offset + limit > MAX_RESULTS:
+            return 400, _error('VALIDATION_ERROR', f'Too many results requested, limit+offset must be <= {MAX_RESULTS}.')
+        if radius > SyntheticYelp.MAX_RADIUS:
+            return 400, _error('VALIDATION_ERROR', f'radius must be <= {SyntheticYelp.MAX_RADIUS}')
+
+        categories = [alias.strip() for value in query.get('categories', [])
+                      for alias in value.split(',') if alias.strip()]
+        found = self.data.search(latitude, longitude, radius, categories)
+        return 200, {
+            'businesses': [self.data.business(index, round(distance, 2))
+                           for distance, index in found[offset:offset + limit]],
+            'total': len(found),
+            'region': {'center': {'latitude': latitude, 'longitude': longitude}}
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                authorized = self.headers.get('Authorization', '').startswith('Bearer ')
+                status, body, headers = server.handle(parsed.path, parse_qs(parsed.query), authorized)
+                server._count(f'status_{status}')
+
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def _error(code: str, description: str) -> Dict:
+    return {'error': {'code': code, 'description': description}}
+
+def main():
+    """Run the stub server until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve synthetic Yelp Fusion API responses.")
+    parser.add_argument('--businesses', type=int, default=1000, help="Synthetic businesses (default: 1000)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many extra seconds per response")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="Share of requests answered with HTTP 429")
+    parser.add_argument('--retry-after', type=float, help="Retry-After seconds sent with each 429")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubYelpServer(args.businesses, args.latency, args.jitter, args.rate_429, args.retry_after,
+                            host=args.host, port=args.port, seed=args.seed)
+    print(f"🧪 Serving {args.businesses} synthetic businesses at {server.url}")
+    print(f"   Use: YELP_BASE_URL={server.url} YELP_API_KEY=stub python main.py")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()